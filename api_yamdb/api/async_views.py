@@ -0,0 +1,182 @@
+"""
+Асинхронные представления чтения для ASGI (ASYNC_READ_VIEWS).
+
+Под ASGI Django 3.2 выполняет синхронные представления в одном потоке,
+поэтому медленный запрос к БД задерживает все остальные. Обёртка
+read_async выполняет GET и HEAD синхронного представления DRF
+в ограниченном пуле потоков (ASGI_READ_THREADS), остальные методы -
+как обычно, в общем потоке Django (транзакции записи не меняются).
+Потоковые ответы ReadPoolASGIHandler читает в том же пуле.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+
+from api_yamdb.profiling import run_profiled
+
+READ_METHODS = ("GET", "HEAD")
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.ASGI_READ_THREADS,
+                thread_name_prefix="api-read",
+            )
+        return executor
+
+
+def call_in_thread(function, *args):
+    """
+    Соединения с БД у потоков пула свои: устаревшие закрываются
+    до и после вызова, как по сигналам начала и конца запроса.
+    Профилируемый запрос выполняется под своим cProfile.
+    """
+    close_old_connections()
+    try:
+        return run_profiled(function, *args)
+    finally:
+        close_old_connections()
+
+
+async def run_in_read_pool(function, *args):
+    """function(*args) в пуле чтения с контекстом вызывающего."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), context.run, call_in_thread, function, *args
+    )
+
+
+def render_view(view, request, args, kwargs):
+    response = view(request, *args, **kwargs)
+    # Ответ DRF сериализуется в JSON здесь, а не в потоке Django.
+    if hasattr(response, "render") and callable(response.render):
+        response = response.render()
+    return response
+
+
+def read_async(view):
+    """Асинхронная обёртка синхронного представления."""
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await run_in_read_pool(
+                render_view, view, request, args, kwargs
+            )
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    return async_view
+
+
+def read_async_urls(urlpatterns, names):
+    """Представления маршрутов с именами из names оборачиваются."""
+    for pattern in urlpatterns:
+        if getattr(pattern, "name", None) in names:
+            pattern.callback = read_async(pattern.callback)
+    return urlpatterns
+
+
+def produce_chunks(iterator, queue, loop, chunk_size, stopped):
+    """
+    Итерация потокового ответа целиком в одном потоке пула: курсор БД
+    нельзя передавать между потоками. Части склеиваются в куски
+    до chunk_size байт, очередь ограничена и задерживает поток,
+    если клиент читает медленнее. stopped прерывает итерацию,
+    когда клиент отключился.
+    """
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    try:
+        buffer = []
+        size = 0
+        for part in iterator:
+            buffer.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                put(b"".join(buffer))
+                buffer = []
+                size = 0
+            if stopped.is_set():
+                return
+        if buffer:
+            put(b"".join(buffer))
+    finally:
+        put(None)
+
+
+class ReadPoolASGIHandler(ASGIHandler):
+    """ASGIHandler, который читает потоковые ответы в пуле чтения."""
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append(
+                (
+                    b"Set-Cookie",
+                    cookie.output(header="").encode("ascii").strip(),
+                )
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": response_headers,
+            }
+        )
+        queue = asyncio.Queue(maxsize=4)
+        stopped = threading.Event()
+        producer = asyncio.ensure_future(
+            run_in_read_pool(
+                produce_chunks,
+                iter(response),
+                queue,
+                asyncio.get_running_loop(),
+                self.chunk_size,
+                stopped,
+            )
+        )
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    }
+                )
+        finally:
+            # Поток пула не должен остаться ждать места в очереди.
+            stopped.set()
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.01)
+        await producer
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import AUTH_VERSION_CLAIM, get_user_from_claims
+
+
+class UserCache:
+    """
+    Ограниченный LRU-кеш пользователей в памяти процесса.
+    Записи живут AUTH_USER_CACHE_TIMEOUT секунд, ключ -
+    (id пользователя, версия прав из токена).
+    Хранятся значения полей, а не объект: get каждый раз собирает
+    новый экземпляр (from_db), поэтому трекер полей и изменения
+    объекта в запросе не переходят в другие запросы.
+    Попадания и промахи считаются для метрик (api_yamdb.metrics).
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            row, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        model, db, values = row
+        return model.from_db(
+            db,
+            [field.attname for field in model._meta.concrete_fields],
+            values,
+        )
+
+    def set(self, key, user):
+        row = (
+            type(user),
+            user._state.db,
+            [
+                getattr(user, field.attname)
+                for field in user._meta.concrete_fields
+            ],
+        )
+        with self.lock:
+            self.entries[key] = (
+                row,
+                time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT,
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к БД на каждый запрос.
+    Пользователи берутся из user_cache, изменения пользователя
+    сбрасывают его записи в этом процессе (api.signals), в остальных
+    процессах устаревшая запись живёт не дольше AUTH_USER_CACHE_TIMEOUT.
+    С JWT_TRUST_ROLE_CLAIMS пользователь собирается из полей токена:
+    смена роли или блокировка действуют только на новые токены.
+    """
+
+    def get_user(self, validated_token):
+        if settings.JWT_TRUST_ROLE_CLAIMS:
+            user = get_user_from_claims(validated_token)
+            if user is not None:
+                return user
+        return self.get_cached_user(validated_token)
+
+    def get_cached_user(self, validated_token):
+        """Пользователь токена из user_cache или из БД."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+        key = (user_id, validated_token.get(AUTH_VERSION_CLAIM))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return user
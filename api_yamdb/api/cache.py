@@ -0,0 +1,108 @@
+"""
+Кеш ответов каталога: категорий, жанров и произведений.
+
+Ключ записи содержит поколения ресурса. Сигналы моделей увеличивают
+поколение после коммита изменения, старые записи перестают читаться
+и вытесняются по таймауту. Поколения ресурса:
+    all - всё представление ресурса (меняется при изменении
+          вложенных категорий и жанров);
+    list - списки ресурса;
+    <pk> - отдельный объект.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "api-response"
+
+CACHED_RESOURCES = ("categories", "genres", "titles")
+
+CACHE_EVENTS = ("hits", "misses")
+
+
+def generation_key(resource, scope):
+    return f"{KEY_PREFIX}:generation:{resource}:{scope}"
+
+
+def new_generation():
+    """
+    Начальное значение поколения уникально, чтобы вытесненный
+    счётчик не вернул к жизни записи со старым номером.
+    """
+    return time.time_ns()
+
+
+def get_generations(resource, scopes):
+    keys = [generation_key(resource, scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, new_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(resource, *scopes):
+    for scope in scopes:
+        key = generation_key(resource, scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), timeout=None)
+
+
+def invalidate(resource, *scopes):
+    """Сбрасывает поколения ресурса после коммита текущей транзакции."""
+    transaction.on_commit(lambda: bump_generations(resource, *scopes))
+
+
+def request_identity(request):
+    """
+    Полный адрес запроса с отсортированными параметрами (от адреса
+    зависят ссылки пагинации) и выбранный тип ответа.
+    """
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    url = request.build_absolute_uri(request.path)
+    return f"{url}?{query}|{request.accepted_media_type}"
+
+
+def response_key(request, resource, scopes):
+    """
+    Ключ ответа: поколения ресурса и request_identity. Запросы с одним
+    ключом получают один ETag (ConditionalGetMixin.get_etag).
+    """
+    digest = hashlib.md5(request_identity(request).encode()).hexdigest()
+    generations = ":".join(map(str, get_generations(resource, scopes)))
+    return f"{KEY_PREFIX}:{resource}:{generations}:{digest}"
+
+
+def count_event(resource, event):
+    key = f"{KEY_PREFIX}:stats:{resource}:{event}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats(resources):
+    """Счётчики попаданий и промахов кеша по ресурсам."""
+    keys = {
+        (resource, event): f"{KEY_PREFIX}:stats:{resource}:{event}"
+        for resource in resources
+        for event in CACHE_EVENTS
+    }
+    values = cache.get_many(keys.values())
+    return {
+        resource: {
+            event: values.get(keys[resource, event], 0)
+            for event in CACHE_EVENTS
+        }
+        for resource in resources
+    }
@@ -1,6 +1,7 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
@@ -8,6 +9,8 @@ class TitleFilter(filters.FilterSet):
     Кастомный фильтр для Title.
     Позволяет осуществлять поиск по полям.
         В частности, по полю genre с параметром slug.
+    Параметр q - полнотекстовый поиск по названию и описанию,
+    результаты сортируются по релевантности.
     """
 
     name = filters.CharFilter(field_name="name")
@@ -15,7 +18,11 @@ class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name="genre__slug")
     category = filters.CharFilter(field_name="category__slug")
     description = filters.CharFilter(field_name="description")
+    q = filters.CharFilter(method="search")
 
     class Meta:
         model = Title
         fields = "__all__"
+
+    def search(self, queryset, name, value):
+        return search_titles(queryset, value)
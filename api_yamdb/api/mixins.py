@@ -1,4 +1,19 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework import viewsets, mixins
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from api_yamdb.profiling import timed_serialization
+from reviews.models import Review, Title
+from .cache import count_event, request_identity, response_key
+from .readers import get_read_plan
 
 
 class ListRetrieveCreateDestroyViewSet(
@@ -14,3 +29,273 @@ class ListRetrieveCreateDestroyViewSet(
     """
 
     pass
+
+
+class NestedResourceMixin:
+    """
+    Миксин вложенных маршрутов titles/{title_id}/reviews/{review_id}/...
+    Вся цепочка родителей проверяется одним запросом
+    (отзыв должен принадлежать произведению), найденные объекты
+    запоминаются до конца запроса.
+    """
+
+    def get_review(self):
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review.objects.select_related("title"),
+                pk=self.kwargs.get("review_id"),
+                title=self.kwargs.get("title_id"),
+            )
+        return self._review
+
+    def get_title(self):
+        if "review_id" in self.kwargs:
+            return self.get_review().title
+        if not hasattr(self, "_title"):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get("title_id")
+            )
+        return self._title
+
+
+class CursorPaginationMixin:
+    """
+    Миксин опциональной курсорной пагинации.
+    По умолчанию используется pagination_class,
+    с параметром ?pagination=cursor (или переданным курсором)
+    - cursor_pagination_class.
+    """
+
+    cursor_pagination_class = None
+    pagination_mode_query_param = "pagination"
+
+    def is_cursor_pagination(self):
+        query_params = self.request.query_params
+        return (
+            query_params.get(self.pagination_mode_query_param) == "cursor"
+            or self.cursor_pagination_class.cursor_query_param in query_params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and (
+            self.cursor_pagination_class is not None
+            and self.is_cursor_pagination()
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class FastReadMixin:
+    """
+    Миксин быстрого чтения списков.
+    Строки страницы выбираются через values_list и собираются в словари
+    по плану, скомпилированному из сериализатора (api/readers.py),
+    без полей DRF. Ответ совпадает с ответом сериализатора.
+    """
+
+    def get_read_plan(self):
+        return get_read_plan(self.get_serializer_class())
+
+    def get_ordering_fields(self):
+        """Поля курсора должны попасть в выбранные строки."""
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return [field.lstrip("-") for field in ordering]
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = plan.rows(queryset, *self.get_ordering_fields())
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(timed_serialization(plan.build, list(rows)))
+        return self.get_paginated_response(
+            timed_serialization(plan.build, page)
+        )
+
+
+class StreamingListMixin(FastReadMixin):
+    """
+    Миксин опциональной потоковой отдачи списка (?stream=true).
+    Пагинатор отбирает только ключи страницы, строки читаются
+    и собираются пачками по stream_chunk_size, а JSON отдаётся
+    по мере готовности в прежнем конверте с results в конце.
+    """
+
+    stream_query_param = "stream"
+    stream_chunk_size = 100
+
+    def is_streaming(self):
+        return (
+            self.request.query_params.get(self.stream_query_param)
+            in ("1", "true")
+            and self.paginator is not None
+            and self.request.accepted_renderer.format == "json"
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streaming():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        keys = self.paginate_queryset(
+            queryset.prefetch_related(None).values_list(
+                "pk", *self.get_ordering_fields(), named=True
+            )
+        )
+        envelope = self.paginator.get_paginated_response([]).data
+        return StreamingHttpResponse(
+            self.stream_list(queryset, [key.pk for key in keys], envelope),
+            content_type=request.accepted_renderer.media_type,
+        )
+
+    def stream_list(self, queryset, pks, envelope):
+        plan = self.get_read_plan()
+        renderer = JSONRenderer()
+        envelope.pop("results")
+        yield renderer.render(envelope)[:-1] + b',"results":['
+        separator = b""
+        for start in range(0, len(pks), self.stream_chunk_size):
+            end = start + self.stream_chunk_size
+            chunk = pks[start:end]
+            rows = {
+                row.pk: row for row in plan.rows(queryset.filter(pk__in=chunk))
+            }
+            data = plan.build([rows[pk] for pk in chunk if pk in rows])
+            if data:
+                yield separator + renderer.render(data)[1:-1]
+                separator = b","
+        yield b"]}"
+
+
+def conditional_response(request, etag, timestamp, get_response):
+    """
+    Отдаёт 304, если ETag или дата изменения совпали с условиями запроса,
+    иначе вызывает get_response. Заголовки версии ставятся в обоих случаях.
+    """
+    response = get_conditional_response(
+        request._request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = get_response()
+    if response.status_code in (200, 304):
+        if etag:
+            response["ETag"] = etag
+        if timestamp:
+            response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Базовый миксин кеширования ответов на GET-запросы.
+    Кешируются данные ответа (до рендеринга) вместе с ETag
+    и Last-Modified, поэтому попадание в кеш, в том числе 304,
+    не обращается к БД. Ключ строится по поколениям ресурса
+    cache_resource и адресу запроса.
+    """
+
+    cache_resource = None
+
+    def get_cached_response(self, scopes, handler, request, *args, **kwargs):
+        key = response_key(request, self.cache_resource, scopes)
+        entry = cache.get(key)
+        if entry is not None:
+            count_event(self.cache_resource, "hits")
+            data, etag, timestamp = entry
+            response = conditional_response(
+                request, etag, timestamp, lambda: Response(data)
+            )
+            response["X-Cache"] = "HIT"
+            return response
+        count_event(self.cache_resource, "misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            entry = (
+                response.data,
+                response.get("ETag"),
+                parse_http_date_safe(response.get("Last-Modified")),
+            )
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    """Кеширует списки ресурса."""
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            ("all", "list"), super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Кеширует отдельные объекты ресурса."""
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.get_cached_response(
+            ("all", lookup), super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы для list и retrieve.
+    Версия ресурса берётся из updated_at дешёвым запросом до сериализации:
+    при совпадении If-None-Match или If-Modified-Since сразу отдаётся 304.
+    Версия - пара (отпечаток для ETag, дата для Last-Modified или None).
+    """
+
+    def get_list_version(self):
+        return None
+
+    def get_object_version(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated_at = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        return updated_at, updated_at
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            self.get_list_version(), super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            self.get_object_version(),
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def get_etag(self, request, fingerprint):
+        """
+        ETag зависит от версии, адреса с параметрами и типа ответа
+        так же, как ключ кеша ответов.
+        """
+        source = f"{request_identity(request)}|{fingerprint!r}"
+        return '"%s"' % hashlib.sha1(source.encode()).hexdigest()
+
+    def get_conditional_response(
+        self, version, handler, request, *args, **kwargs
+    ):
+        if version is None:
+            return handler(request, *args, **kwargs)
+        fingerprint, last_modified = version
+        return conditional_response(
+            request,
+            self.get_etag(request, fingerprint),
+            last_modified and int(last_modified.timestamp()),
+            lambda: handler(request, *args, **kwargs),
+        )
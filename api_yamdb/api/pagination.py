@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по первичному ключу.
+    Страница выбирается условием по индексу (id > курсор),
+    поэтому её стоимость не зависит от глубины, а COUNT не выполняется.
+    Размер страницы задаётся тем же параметром limit.
+    """
+
+    ordering = "id"
+    page_size_query_param = "limit"
+
+
+class NewestFirstCursorPagination(IdCursorPagination):
+    """Курсорная пагинация от новых записей к старым."""
+
+    ordering = "-id"
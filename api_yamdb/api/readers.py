@@ -0,0 +1,153 @@
+from functools import lru_cache
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import fields, relations, serializers
+
+# Поля, представление которых совпадает со значением из БД.
+IDENTITY_REPRESENTATIONS = {
+    fields.CharField.to_representation,
+    fields.IntegerField.to_representation,
+    fields.ReadOnlyField.to_representation,
+}
+
+
+def related_lookup(prefix, name):
+    return f"{prefix}__{name}" if prefix else name
+
+
+def related_ordering(prefix, model):
+    """Meta.ordering связанной модели, перенесённое на путь prefix."""
+    ordering = []
+    for field in model._meta.ordering:
+        descending = field.startswith("-")
+        lookup = related_lookup(prefix, field.lstrip("-"))
+        ordering.append(f"-{lookup}" if descending else lookup)
+    return ordering
+
+
+class ReadPlan:
+    """
+    Скомпилированный план чтения для сериализатора.
+    Колонки выбираются одним values_list, словарь ответа собирается
+    заранее подготовленными геттерами без полей DRF. Вложенные списки
+    (many=True) читаются отдельным запросом на страницу, как prefetch.
+    Колонки вложенного списка берутся через связь prefix.
+    Поддерживаются поля, которые есть в сериализаторах для чтения:
+    простые поля, SlugRelatedField, PrimaryKeyRelatedField
+    и вложенные сериализаторы.
+    """
+
+    def __init__(self, serializer_class, prefix=""):
+        self.model = serializer_class.Meta.model
+        self.lookups = ["pk"]
+        self.many = []
+        self.getters = self.compile(serializer_class(), prefix)
+
+    def column(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def compile(self, serializer, prefix):
+        getters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            lookup = related_lookup(prefix, field.source.replace(".", "__"))
+            if isinstance(field, serializers.ListSerializer):
+                if prefix:
+                    raise ImproperlyConfigured(
+                        f"{name}: вложенные списки глубже одного уровня"
+                    )
+                self.many.append((name, lookup, field.child))
+                getters.append((name, None))
+            elif isinstance(field, serializers.BaseSerializer):
+                getters.append((name, self.nested(field, lookup)))
+            elif isinstance(field, relations.SlugRelatedField):
+                lookup = related_lookup(lookup, field.slug_field)
+                getters.append((name, itemgetter(self.column(lookup))))
+            elif isinstance(field, relations.PrimaryKeyRelatedField):
+                getters.append((name, itemgetter(self.column(lookup))))
+            elif isinstance(field, relations.RelatedField):
+                raise ImproperlyConfigured(
+                    f"{name}: {type(field).__name__} не поддерживается"
+                )
+            else:
+                getters.append((name, self.value(field, lookup)))
+        return getters
+
+    def value(self, field, lookup):
+        index = self.column(lookup)
+        to_representation = field.to_representation
+        if to_representation.__func__ in IDENTITY_REPRESENTATIONS:
+            return itemgetter(index)
+
+        def get(row):
+            value = row[index]
+            return None if value is None else to_representation(value)
+
+        return get
+
+    def nested(self, serializer, lookup):
+        index = self.column(lookup)
+        getters = self.compile(serializer, lookup)
+
+        def get(row):
+            if row[index] is None:
+                return None
+            return {name: getter(row) for name, getter in getters}
+
+        return get
+
+    def rows(self, queryset, *extra):
+        """
+        Колонки плана (и extra, например поле курсора) как именованные
+        кортежи. Результат можно передавать пагинатору вместо объектов.
+        """
+        lookups = self.lookups + [
+            lookup for lookup in extra if lookup not in self.lookups
+        ]
+        return queryset.prefetch_related(None).values_list(
+            *lookups, named=True
+        )
+
+    def build(self, rows):
+        """Словари ответа для строк из rows() в том же порядке."""
+        items = []
+        for row in rows:
+            item = {}
+            for name, getter in self.getters:
+                item[name] = getter(row) if getter else None
+            items.append(item)
+        for name, lookup, child in self.many:
+            related = self.read_many(lookup, child, [row[0] for row in rows])
+            for item, row in zip(items, rows):
+                item[name] = related.get(row[0], [])
+        return items
+
+    def read_many(self, lookup, child, pks):
+        plan = get_read_plan(type(child), lookup)
+        related_model = self.model._meta.get_field(lookup).related_model
+        queryset = (
+            self.model.objects.filter(
+                pk__in=pks, **{f"{lookup}__isnull": False}
+            )
+            .order_by(*related_ordering(lookup, related_model))
+            .values_list("pk", *plan.lookups[1:])
+        )
+        related = {}
+        for row in queryset:
+            related.setdefault(row[0], []).append(
+                {name: getter(row) for name, getter in plan.getters}
+            )
+        return related
+
+
+@lru_cache(maxsize=None)
+def get_read_plan(serializer_class, prefix=""):
+    """
+    План компилируется один раз на сериализатор.
+    prefix - путь связи, через которую читается вложенный список.
+    """
+    return ReadPlan(serializer_class, prefix)
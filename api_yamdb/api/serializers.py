@@ -1,9 +1,13 @@
-from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
+from django.db import IntegrityError
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import exceptions, validators, serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
+from api_yamdb.profiling import timed_serialization
 from reviews.models import (
     Category,
     Comment,
@@ -12,14 +16,34 @@ from reviews.models import (
     Title,
     User,
 )
+from .authentication import CachedJWTAuthentication
+from .tokens import (
+    confirmation_code_generator,
+    get_tokens_for_user,
+    set_user_claims,
+)
 from .validators import UsernameValidator, check_unique_email_and_name
 
+DUPLICATE_REVIEW_MESSAGE = (
+    "Вы не можете дважды комментировать одно произведение"
+)
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """
+    Базовый сериализатор ответов API: время to_representation
+    учитывается в профиле запроса (api_yamdb.profiling).
+    """
+
+    def to_representation(self, instance):
+        return timed_serialization(super().to_representation, instance)
+
 
 class MyObtainTokenSerializer(serializers.ModelSerializer):
     """Сериализатор получения токена для зарегистрированного пользователя."""
 
     confirmation_code = serializers.CharField(
-        max_length=150, min_length=4, write_only=True, source="password"
+        max_length=150, min_length=4, write_only=True
     )
 
     class Meta:
@@ -34,23 +58,52 @@ class MyObtainTokenSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        """Валидатор для 'username' и 'confirmation_code'."""
+        """
+        Валидатор для 'username' и 'confirmation_code'.
+        Код проверяется по HMAC, после выдачи токена он погашен.
+        Заблокированный пользователь токен не получает.
+        """
         user = get_object_or_404(User, username=data["username"])
-        authenticate_kwargs = {
-            "username": user.username,
-            "password": data["password"],
-        }
-        user = authenticate(**authenticate_kwargs)
-        if user is None:
+        if not user.is_active or not confirmation_code_generator.check_token(
+            user, data["confirmation_code"]
+        ):
             raise exceptions.ValidationError(
                 "Код подтверждения не действителен!"
             )
-        refresh = RefreshToken.for_user(user)
+        update_last_login(None, user)
+        refresh = get_tokens_for_user(user)
         return {
             "access": str(refresh.access_token),
+            "refresh": str(refresh),
         }
 
 
+class RefreshTokenSerializer(TokenRefreshSerializer):
+    """
+    Обновление токенов по refresh-токену без кода подтверждения.
+    Пользователь берётся из кеша аутентификации, поля прав в новых
+    токенах обновляются. При ROTATE_REFRESH_TOKENS выдаётся новый
+    refresh-токен, с BLACKLIST_AFTER_ROTATION старый больше не примут.
+    """
+
+    access = None
+    token = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = CachedJWTAuthentication().get_cached_user(refresh)
+        set_user_claims(refresh, user)
+        data = {"token": str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
 class SingUpSerializer(serializers.ModelSerializer):
     """Сериализатор регистрации через email."""
 
@@ -91,7 +144,7 @@ class SingUpSerializer(serializers.ModelSerializer):
         return User.objects.get_or_create(**validated_data)
 
 
-class AdminCreateSerializer(serializers.ModelSerializer):
+class AdminCreateSerializer(TimedModelSerializer):
     """Сериализатор регистрации пользователей админом"""
 
     class Meta:
@@ -130,7 +183,7 @@ class AdminCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedModelSerializer):
     """Сериалайзер профиля пользователя"""
 
     class Meta:
@@ -151,7 +204,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         model = User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     """
     Сериализатор категорий.
     Исключает поле id при выдаче.
@@ -162,7 +215,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
     """
     Сериализатор жанров.
     Исключает поле id при выдаче.
@@ -173,7 +226,7 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedModelSerializer):
     """
     Сериализатор произведений.
     """
@@ -185,14 +238,14 @@ class TitleSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         queryset=Genre.objects.all(), slug_field="slug", many=True
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = "__all__"
+        exclude = ("score_sum", "score_count", "updated_at")
         model = Title
 
 
-class TitleReadOnlySerializer(serializers.ModelSerializer):
+class TitleReadOnlySerializer(TimedModelSerializer):
     """
     Сериализатор произведений для Get запросов.
     """
@@ -202,11 +255,11 @@ class TitleReadOnlySerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(required=False, read_only=True)
 
     class Meta:
-        fields = "__all__"
+        exclude = ("score_sum", "score_count", "updated_at")
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     """
     Сериализатор отзывов
     """
@@ -221,12 +274,8 @@ class ReviewSerializer(serializers.ModelSerializer):
     title = serializers.HiddenField(default=None)
 
     def validate_title(self, value):
-        """
-        Получаем доступ к переданному в url title_id
-        для дальнейшей валидации.
-        """
-        title_id = self.context["view"].kwargs["title_id"]
-        return get_object_or_404(Title, pk=title_id)
+        """Произведение из url, уже найденное вьюсетом."""
+        return self.context["view"].get_title()
 
     def validate_score(self, value):
         if 1 <= value <= 10:
@@ -236,19 +285,44 @@ class ReviewSerializer(serializers.ModelSerializer):
                 "Оценка может быть в диапазоне от 1 до 10"
             )
 
+    def create(self, validated_data):
+        """
+        Повторный отзыв отсекает ограничение unique_author_title_pair:
+        вместо SELECT перед вставкой ошибка вставки переводится в 400.
+        """
+        return self.save_unique(
+            super().create,
+            validated_data["author"],
+            validated_data["title"],
+            validated_data,
+        )
+
+    def update(self, instance, validated_data):
+        """Смена автора на уже оставившего отзыв - тоже 400."""
+        return self.save_unique(
+            super().update,
+            validated_data.get("author", instance.author),
+            validated_data.get("title", instance.title),
+            instance,
+            validated_data,
+        )
+
+    def save_unique(self, save, author, title, *args):
+        try:
+            return save(*args)
+        except IntegrityError:
+            if not Review.objects.filter(author=author, title=title).exists():
+                raise
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]}
+            )
+
     class Meta:
         fields = ("id", "text", "author", "score", "pub_date", "title")
         model = Review
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=Review.objects.all(),
-                fields=("author", "title"),
-                message="Вы не можете дважды комментировать одно произведение",
-            )
-        ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     """
     Сериализатор комментариев
     """
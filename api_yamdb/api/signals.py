@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title, User
+from .authentication import user_cache
+from .cache import invalidate
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    """Категория входит в представление произведений."""
+    invalidate("categories", "list")
+    invalidate("titles", "all")
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre(sender, instance, **kwargs):
+    """Жанры входят в представление произведений."""
+    invalidate("genres", "list")
+    invalidate("titles", "all")
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate("titles", "list", instance.pk)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_related_title(sender, instance, **kwargs):
+    """Жанры и рейтинг (отзывы) входят в представление произведения."""
+    invalidate("titles", "list", instance.title_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Изменение жанров через title.genre.set()/add()/remove() и
+    genre.titles.* не вызывает post_save связующей модели.
+    """
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate("titles", "list", instance.pk)
+    elif pk_set:
+        invalidate("titles", "list", *pk_set)
+    else:
+        invalidate("titles", "all")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Пользователь (роль, активность) кешируется аутентификацией.
+    Сброс после фиксации, чтобы не закешировать старую строку.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: user_cache.invalidate(pk))
@@ -0,0 +1,184 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket.
+
+Корзина вмещает столько жетонов, сколько запросов разрешено за период
+ставки ("20/min"), и пополняется равномерно. Запрос забирает жетон,
+пустая корзина даёт ответ 429 с Retry-After до появления жетона.
+Корзины хранятся в памяти процесса (THROTTLE_STORE = "local")
+или в общем кеше Django (THROTTLE_STORE = "cache").
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = "throttle"
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'20/min' -> (ёмкость корзины, жетонов в секунду)."""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / DURATIONS[period[0]]
+
+
+def take_token(bucket, capacity, refill, now):
+    """
+    Пополняет корзину (жетоны, время) на момент now и забирает жетон.
+    Возвращает новую корзину и паузу до следующего жетона
+    (0, если жетон выдан).
+    """
+    if bucket is None:
+        tokens = capacity
+    else:
+        tokens, updated = bucket
+        tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LocalBucketStore:
+    """
+    Корзины в памяти процесса: ограниченный LRU под блокировкой.
+    Лимит действует на каждый процесс отдельно.
+    """
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, refill):
+        with self.lock:
+            bucket, wait = take_token(
+                self.buckets.get(key), capacity, refill, time.monotonic()
+            )
+            self.buckets[key] = bucket
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > settings.THROTTLE_LOCAL_SIZE:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Корзины в кеше Django, общие для всех процессов. Чтение и запись
+    не атомарны: при одновременных запросах лимит может быть превышен
+    на число конкурирующих процессов. Запись живёт, пока корзина
+    не наполнится снова.
+    """
+
+    def consume(self, key, capacity, refill):
+        bucket, wait = take_token(
+            cache.get(key), capacity, refill, time.time()
+        )
+        cache.set(key, bucket, timeout=int(capacity / refill) + 1)
+        return wait
+
+    def clear(self):
+        pass
+
+
+BUCKET_STORES = {
+    "local": LocalBucketStore(),
+    "cache": CacheBucketStore(),
+}
+
+
+def get_bucket_store():
+    store = settings.THROTTLE_STORE
+    if store not in BUCKET_STORES:
+        BUCKET_STORES[store] = import_string(store)()
+    return BUCKET_STORES[store]
+
+
+def rejected_key(scope):
+    return f"{KEY_PREFIX}:rejected:{scope}"
+
+
+def count_rejection(scope):
+    key = rejected_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_rejections(scopes):
+    """Счётчики отказов по областям ограничения."""
+    keys = {scope: rejected_key(scope) for scope in scopes}
+    values = cache.get_many(keys.values())
+    return {scope: values.get(key, 0) for scope, key in keys.items()}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовое ограничение: ставка берётся из DEFAULT_THROTTLE_RATES
+    по scope, ключ корзины - get_cache_key. Ставка None
+    или ключ None отключают ограничение.
+    """
+
+    scope = None
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError(".get_cache_key() must be overridden")
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = self.get_cache_key(request, view)
+        if rate is None or ident is None:
+            return True
+        capacity, refill = parse_rate(rate)
+        wait = get_bucket_store().consume(
+            f"{KEY_PREFIX}:{self.scope}:{ident}", capacity, refill
+        )
+        if wait:
+            self.wait_time = wait
+            count_rejection(self.scope)
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Запросы к эндпоинтам auth с одного адреса."""
+
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Запросы к эндпоинтам auth для одного username с любых адресов."""
+
+    scope = "auth_username"
+
+    def get_cache_key(self, request, view):
+        # Тело не объект (например, JSON-массив) - ошибку вернёт
+        # сериализатор.
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get("username")
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
+
+
+AUTH_THROTTLE_SCOPES = (AuthIPThrottle.scope, AuthUsernameThrottle.scope)
@@ -0,0 +1,86 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import router
+from django.utils.http import base36_to_int
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+AUTH_VERSION_CLAIM = "ver"
+
+# Поля пользователя, которые кладутся в токен для проверки прав.
+USER_CLAIMS = ("username", "role", "is_superuser")
+
+
+class ConfirmationCodeGenerator(PasswordResetTokenGenerator):
+    """
+    Код подтверждения из письма регистрации.
+    Код - HMAC от пользователя и времени выдачи, проверяется
+    сравнением за постоянное время без хешера паролей и не трогает
+    пароль пользователя. Действует CONFIRMATION_CODE_TIMEOUT секунд
+    и одноразовый: в хеш входит last_login, который обновляется
+    при получении токена.
+    """
+
+    key_salt = "api.tokens.ConfirmationCodeGenerator"
+
+    def check_token(self, user, token):
+        if not super().check_token(user, token):
+            return False
+        timestamp = base36_to_int(token.split("-")[0])
+        age = self._num_seconds(self._now()) - timestamp
+        return age <= settings.CONFIRMATION_CODE_TIMEOUT
+
+
+confirmation_code_generator = ConfirmationCodeGenerator()
+
+
+def get_auth_version(user):
+    """
+    Версия прав пользователя: меняется вместе с ролью и активностью,
+    токены, выданные после изменения, не совпадут со старыми в кешах.
+    """
+    source = f"{user.role}|{user.is_superuser}|{user.is_active}"
+    return hashlib.sha1(source.encode()).hexdigest()[:8]
+
+
+def set_user_claims(token, user):
+    """Версия прав и поля для проверки прав из текущего пользователя."""
+    token[AUTH_VERSION_CLAIM] = get_auth_version(user)
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+def get_tokens_for_user(user):
+    """Refresh-токен, access-токен берётся из него (.access_token)."""
+    refresh = RefreshToken.for_user(user)
+    set_user_claims(refresh, user)
+    return refresh
+
+
+def get_user_from_claims(token):
+    """
+    Пользователь из полей токена без запроса к БД.
+    Остальные поля отложены и загрузятся из БД при обращении,
+    save() сохранит только загруженные поля.
+    Возвращает None, если токен выдан без этих полей.
+    """
+    if not all(claim in token for claim in USER_CLAIMS):
+        return None
+    User = get_user_model()
+    claims = {claim: token[claim] for claim in USER_CLAIMS}
+    id_field = User._meta.get_field(api_settings.USER_ID_FIELD)
+    claims[id_field.attname] = token[api_settings.USER_ID_CLAIM]
+    claims["is_active"] = True
+    fields = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in claims
+    ]
+    return User.from_db(
+        router.db_for_read(User),
+        fields,
+        [claims[field] for field in fields],
+    )
@@ -1,19 +1,36 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import read_async_urls
 from .views import (
+    CacheStatsView,
     CategoryViewSet,
     CommentViewSet,
+    DatabaseStatsView,
+    ExportView,
     GenreViewSet,
     ObtainTokenView,
+    RefreshTokenView,
     ReviewViewSet,
     SingUpView,
+    ThrottleStatsView,
     TitleViewSet,
     UsersListViewSet,
 )
 
 app_name = "api"
 
+# Маршруты, чтение которых под ASGI выполняется в пуле потоков.
+ASYNC_READ_ROUTES = (
+    "title-list",
+    "title-detail",
+    "reviews-list",
+    "reviews-detail",
+    "comments-list",
+    "comments-detail",
+)
+
 router = DefaultRouter()
 
 router.register("users", UsersListViewSet)
@@ -31,6 +48,10 @@ router.register(
     basename="comments",
 )
 
+router_urls = router.urls
+if settings.ASYNC_READ_VIEWS:
+    router_urls = read_async_urls(router_urls, ASYNC_READ_ROUTES)
+
 urlpatterns = [
     path("v1/auth/signup/", SingUpView.as_view(), name="singup"),
     path(
@@ -38,5 +59,22 @@ urlpatterns = [
         ObtainTokenView.as_view(),
         name="token_obtain_access",
     ),
-    path("v1/", include(router.urls)),
+    path(
+        "v1/auth/token/refresh/",
+        RefreshTokenView.as_view(),
+        name="token_refresh",
+    ),
+    path("v1/cache/stats/", CacheStatsView.as_view(), name="cache_stats"),
+    path("v1/db/stats/", DatabaseStatsView.as_view(), name="db_stats"),
+    path(
+        "v1/throttle/stats/",
+        ThrottleStatsView.as_view(),
+        name="throttle_stats",
+    ),
+    path(
+        "v1/export/<slug:table>.<slug:export_format>",
+        ExportView.as_view(),
+        name="export",
+    ),
+    path("v1/", include(router_urls)),
 ]
@@ -1,14 +1,24 @@
-from django.db.models.functions import Round
-from django.core.mail import send_mail
 from django.conf import settings
-from django.shortcuts import get_object_or_404
-from django.contrib.auth.tokens import default_token_generator
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from rest_framework import filters, status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from api_yamdb.db_router import get_routing_stats
+from api_yamdb.postgresql_pool.pool import get_stats as get_pool_stats
+from reviews.dataset import (
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMATS,
+    export_lines,
+    get_export_model,
+)
 from reviews.models import (
     Category,
     Comment,
@@ -16,8 +26,8 @@ from reviews.models import (
     Review,
     Title,
     User,
-    models,
 )
+from reviews.outbox import queue_mail
 from .permissions import (
     AdminOnly,
     IsAdminOrReadOnly,
@@ -30,14 +40,32 @@ from .serializers import (
     GenreSerializer,
     MyObtainTokenSerializer,
     ProfileSerializer,
+    RefreshTokenSerializer,
     ReviewSerializer,
     SingUpSerializer,
     TitleSerializer,
     TitleReadOnlySerializer,
 )
 
+from .cache import CACHED_RESOURCES, get_stats
 from .filters import TitleFilter
-from .mixins import ListRetrieveCreateDestroyViewSet
+from .mixins import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    ListRetrieveCreateDestroyViewSet,
+    NestedResourceMixin,
+    StreamingListMixin,
+)
+from .pagination import IdCursorPagination, NewestFirstCursorPagination
+from .throttling import (
+    AUTH_THROTTLE_SCOPES,
+    AuthIPThrottle,
+    AuthUsernameThrottle,
+    get_rejections,
+)
+from .tokens import confirmation_code_generator
 
 
 class ObtainTokenView(views.APIView):
@@ -47,13 +75,17 @@ class ObtainTokenView(views.APIView):
     permission_classes = [
         AllowAny,
     ]
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request):
         """Обработка post запроса на получение токена."""
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid(raise_exception=True):
             return Response(
-                {"token": serializer.validated_data.get("access")},
+                {
+                    "token": serializer.validated_data.get("access"),
+                    "refresh": serializer.validated_data.get("refresh"),
+                },
                 status=status.HTTP_200_OK,
             )
         else:
@@ -62,13 +94,26 @@ class ObtainTokenView(views.APIView):
             )
 
 
+class RefreshTokenView(TokenRefreshView):
+    """
+    Новый access_token (и refresh_token при ротации) по refresh_token,
+    без повторного ввода кода подтверждения.
+    """
+
+    serializer_class = RefreshTokenSerializer
+
+
 class SingUpView(views.APIView):
-    """Генерирует verification_code и отправляет на email пользователя"""
+    """
+    Генерирует confirmation_code и отправляет на email пользователя.
+    Пароль пользователя не меняется, новым задаётся непригодный пароль.
+    """
 
     serializer_class = SingUpSerializer
     permission_classes = [
         AllowAny,
     ]
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request, format=None):
         """Обработка POST запроса"""
@@ -76,18 +121,22 @@ class SingUpView(views.APIView):
         if serializer.is_valid(raise_exception=True):
             email = serializer.data.get("email")
             username = serializer.data.get("username")
-            user, _ = User.objects.get_or_create(
-                email=email, username=username
-            )
-            password = default_token_generator.make_token(user)
-            send_mail(
-                settings.EMAIL_SUBJECT,
-                f"confirmation_code : {password}",
-                settings.EMAIL_SENDER,
-                (f"{email}",),
-            )
-            user.set_password(password)
-            user.save()
+            # Письмо уходит через очередь командой send-emails.
+            with transaction.atomic():
+                user, _ = User.objects.get_or_create(
+                    email=email,
+                    username=username,
+                    defaults={"password": make_password(None)},
+                )
+                confirmation_code = confirmation_code_generator.make_token(
+                    user
+                )
+                queue_mail(
+                    settings.EMAIL_SUBJECT,
+                    f"confirmation_code : {confirmation_code}",
+                    settings.EMAIL_SENDER,
+                    (f"{email}",),
+                )
 
             return Response(
                 SingUpSerializer(user).data, status=status.HTTP_200_OK
@@ -96,6 +145,69 @@ class SingUpView(views.APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CacheStatsView(views.APIView):
+    """Счётчики попаданий и промахов кеша ответов. Доступно админу."""
+
+    permission_classes = [
+        AdminOnly,
+    ]
+
+    def get(self, request):
+        return Response(get_stats(CACHED_RESOURCES))
+
+
+class ThrottleStatsView(views.APIView):
+    """Счётчики отказов ограничения частоты auth. Доступно админу."""
+
+    permission_classes = [
+        AdminOnly,
+    ]
+
+    def get(self, request):
+        return Response(get_rejections(AUTH_THROTTLE_SCOPES))
+
+
+class DatabaseStatsView(views.APIView):
+    """
+    Метрики БД этого воркера: пулы соединений
+    (DB_ENGINE=api_yamdb.postgresql_pool) и маршрутизация
+    чтений на реплики. Доступно админу.
+    """
+
+    permission_classes = [
+        AdminOnly,
+    ]
+
+    def get(self, request):
+        return Response(
+            {"pools": get_pool_stats(), "routing": get_routing_stats()}
+        )
+
+
+class ExportView(views.APIView):
+    """
+    Потоковая выгрузка таблицы в csv (формат load-data) или ndjson.
+    Доступно админу.
+    """
+
+    permission_classes = [
+        AdminOnly,
+    ]
+
+    def get(self, request, table, export_format):
+        model = get_export_model(table)
+        if model is None or export_format not in EXPORT_FORMATS:
+            raise NotFound(f"Нет выгрузки {table}.{export_format}")
+        response = StreamingHttpResponse(
+            export_lines(model, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{table}.{export_format}"'
+        return response
+
+
 class UsersListViewSet(viewsets.ModelViewSet):
     """Вьюсет пользователей доступен только админам"""
 
@@ -127,22 +239,28 @@ class UsersListViewSet(viewsets.ModelViewSet):
         if request.method == "GET":
             return Response(ProfileSerializer(self.request.user).data)
         elif request.method == "PATCH":
+            # Пользователь запроса может быть из кеша или из полей токена:
+            # запись идёт поверх актуальной строки.
+            user = User.objects.get(pk=request.user.pk)
             serializer = ProfileSerializer(
-                self.request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data)
 
 
-class CategoryViewSet(ListRetrieveCreateDestroyViewSet):
+class CategoryViewSet(CachedListMixin, ListRetrieveCreateDestroyViewSet):
     """
     Вьюсет категорий.
     Права доступа:
         GET: Доступно без токена
         POST/etc: Админ
+    Списки кешируются.
     """
 
+    cache_resource = "categories"
+
     permission_classes = [IsAdminOrReadOnly]
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
@@ -152,14 +270,17 @@ class CategoryViewSet(ListRetrieveCreateDestroyViewSet):
     lookup_field = "slug"
 
 
-class GenreViewSet(ListRetrieveCreateDestroyViewSet):
+class GenreViewSet(CachedListMixin, ListRetrieveCreateDestroyViewSet):
     """
     Вьюсет категорий.
     Права доступа:
         GET: Доступно без токена
         POST/etc: Админ
+    Списки кешируются.
     """
 
+    cache_resource = "genres"
+
     permission_classes = [IsAdminOrReadOnly]
     serializer_class = GenreSerializer
     queryset = Genre.objects.all()
@@ -169,7 +290,14 @@ class GenreViewSet(ListRetrieveCreateDestroyViewSet):
     lookup_field = "slug"
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CursorPaginationMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет категорий.
     Права доступа:
@@ -177,8 +305,14 @@ class TitleViewSet(viewsets.ModelViewSet):
         POST/etc: Админ
     Присутствует кастомная фильтрация:
         Возможен поиск по полю genre с параметром slug.
+    Пагинация limit/offset или курсорная по id (?pagination=cursor),
+    большие страницы можно получать потоком (?stream=true).
+    Списки и отдельные произведения кешируются,
+    на GET поддерживаются ETag и Last-Modified.
     """
 
+    cache_resource = "titles"
+
     permission_classes = [IsAdminOrReadOnly]
     http_method_names = [
         "get",
@@ -186,10 +320,11 @@ class TitleViewSet(viewsets.ModelViewSet):
         "patch",
         "delete",
     ]
-    queryset = Title.objects.all().annotate(
-        rating=Round(models.Avg("reviews__score"))
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
     )
     pagination_class = LimitOffsetPagination
+    cursor_pagination_class = IdCursorPagination
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
@@ -197,38 +332,106 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadOnlySerializer
         return TitleSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
-    """Вьюсет отзывов."""
+    def get_list_version(self):
+        """
+        Количество и последняя дата изменения отобранных произведений.
+        Удаление не оставляет даты, поэтому Last-Modified не отдаётся.
+        """
+        version = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(count=Count("pk"), updated_at=Max("updated_at"))
+        )
+        return (version["count"], version["updated_at"]), None
+
+
+class ReviewViewSet(
+    NestedResourceMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    StreamingListMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    Вьюсет отзывов.
+    На GET поддерживаются ETag и Last-Modified,
+    большие страницы можно получать потоком (?stream=true).
+    """
 
     permission_classes = [IsAdOrModOrAuthorOrReadOnly]
     serializer_class = ReviewSerializer
     pagination_class = LimitOffsetPagination
+    cursor_pagination_class = NewestFirstCursorPagination
 
     def get_queryset(self):
-        title_id = self.kwargs.get("title_id")
-        get_object_or_404(Title, pk=title_id)
-        return Review.objects.filter(title=title_id)
+        return Review.objects.filter(title=self.get_title())
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
-    """Вьюсет комментов."""
+        serializer.save(author=self.request.user, title=self.get_title())
+
+    def get_list_version(self):
+        """
+        Версия списка отзывов: количество и последняя дата изменения отзывов
+        вместе с датой изменения произведения, которая обновляется
+        и при удалении отзыва (вместе с рейтингом).
+        """
+        version = (
+            Title.objects.filter(pk=self.kwargs.get("title_id"))
+            .annotate(
+                count=Count("reviews"),
+                reviews_updated_at=Max("reviews__updated_at"),
+            )
+            .values_list("updated_at", "count", "reviews_updated_at")
+            .first()
+        )
+        if version is None:
+            return None
+        updated_at, _, reviews_updated_at = version
+        return version, max(updated_at, reviews_updated_at or updated_at)
+
+
+class CommentViewSet(
+    NestedResourceMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    StreamingListMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    Вьюсет комментов.
+    На GET поддерживаются ETag и Last-Modified,
+    большие страницы можно получать потоком (?stream=true).
+    """
 
     permission_classes = [IsAdOrModOrAuthorOrReadOnly]
     serializer_class = CommentSerializer
     pagination_class = LimitOffsetPagination
+    cursor_pagination_class = NewestFirstCursorPagination
 
     def get_queryset(self):
-        title_id = self.kwargs.get("title_id")
-        review_id = self.kwargs.get("review_id")
-        get_object_or_404(Title, pk=title_id)
-        get_object_or_404(Review, pk=review_id)
-        return Comment.objects.filter(review=review_id)
+        return Comment.objects.filter(review=self.get_review())
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def get_list_version(self):
+        """
+        Версия списка комментариев, дата изменения отзыва
+        обновляется и при удалении комментария.
+        """
+        version = (
+            Review.objects.filter(
+                pk=self.kwargs.get("review_id"),
+                title=self.kwargs.get("title_id"),
+            )
+            .annotate(
+                count=Count("comments"),
+                comments_updated_at=Max("comments__updated_at"),
+            )
+            .values_list("updated_at", "count", "comments_updated_at")
+            .first()
+        )
+        if version is None:
+            return None
+        updated_at, _, comments_updated_at = version
+        return version, max(updated_at, comments_updated_at or updated_at)
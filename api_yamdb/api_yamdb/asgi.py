@@ -1,7 +1,13 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+# Под ASGI представления чтения API асинхронные (api.async_views).
+os.environ.setdefault("ASYNC_READ_VIEWS", "True")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from api.async_views import ReadPoolASGIHandler  # noqa: E402
+
+application = ReadPoolASGIHandler()
@@ -0,0 +1,195 @@
+"""
+Чтение с реплик БД для запросов к API.
+
+ReplicaRoutingMiddleware отмечает безопасные запросы (GET, HEAD, OPTIONS)
+к /api/, ReplicaRouter отправляет их чтения на одну из DATABASE_REPLICAS,
+в том числе чтения при выдаче потокового ответа (?stream, выгрузка).
+Записи и все запросы вне API идут в default. После успешной записи
+пользователь (по id из JWT) читает из default ещё
+DATABASE_REPLICA_PIN_SECONDS секунд, пока реплики догоняют основную БД.
+Запросы без токена не отмечаются: за nginx у них общий адрес,
+а записи анонимов (signup, token) не читаются ими сразу же.
+Отметка хранится в кеше Django, он должен быть общим для воркеров:
+с репликами и кешем в памяти процесса приложение не запускается.
+"""
+import asyncio
+import random
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+KEY_PREFIX = "db-pin"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Можно ли текущему запросу читать с реплики.
+use_replica = ContextVar("use_replica", default=False)
+
+ROUTING_EVENTS = ("replica_reads", "primary_reads", "writes", "pinned")
+
+routing_counters = dict.fromkeys(ROUTING_EVENTS, 0)
+routing_lock = threading.Lock()
+
+
+def count_routing(event):
+    with routing_lock:
+        routing_counters[event] += 1
+
+
+def get_routing_stats():
+    """Счётчики маршрутизации запросов к БД в этом процессе."""
+    with routing_lock:
+        return dict(routing_counters)
+
+
+# Кеши, которые не видят записи других процессов.
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+jwt_authentication = JWTAuthentication()
+
+
+def get_token_user_id(request):
+    """
+    Id пользователя из JWT в заголовке Authorization, без запроса к БД.
+    Middleware работает до аутентификации DRF, поэтому токен
+    проверяется здесь. None - токена нет или он недействителен.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = jwt_authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = jwt_authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def pin_key(request):
+    """
+    Ключ отметки: новый токен того же пользователя её не сбрасывает.
+    None - запрос без действительного токена не отмечается.
+    """
+    user_id = get_token_user_id(request)
+    if user_id is None:
+        return None
+    return f"{KEY_PREFIX}:user:{user_id}"
+
+
+def routed_content(content, replica):
+    """
+    Потоковый ответ читает из БД уже после выхода из middleware:
+    маршрутизация запроса действует при получении каждой части.
+    """
+    iterator = iter(content)
+    while True:
+        token = use_replica.set(replica)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            use_replica.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: Django видит асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        if settings.DATABASE_REPLICAS and isinstance(
+            caches[DEFAULT_CACHE_ALIAS], LOCAL_CACHES
+        ):
+            raise ImproperlyConfigured(
+                "DB_REPLICAS требует общий для воркеров CACHE_BACKEND: "
+                "отметка чтения из default после записи хранится в кеше"
+            )
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        replica = self.can_use_replica(request)
+        token = use_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        self.finish(request, response, replica)
+        return response
+
+    async def __acall__(self, request):
+        replica = self.can_use_replica(request)
+        token = use_replica.set(replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        self.finish(request, response, replica)
+        return response
+
+    def finish(self, request, response, replica):
+        if response.streaming and replica:
+            response.streaming_content = routed_content(
+                response.streaming_content, replica
+            )
+        self.pin(request, response)
+
+    def can_use_replica(self, request):
+        replica = (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and request.path.startswith("/api/")
+        )
+        if not replica:
+            return False
+        key = pin_key(request)
+        if key is not None and cache.get(key):
+            count_routing("pinned")
+            return False
+        return True
+
+    def pin(self, request, response):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method in SAFE_METHODS
+            or response.status_code >= 400
+        ):
+            return
+        key = pin_key(request)
+        if key is not None:
+            cache.set(
+                key, True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS
+            )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if use_replica.get():
+            count_routing("replica_reads")
+            return random.choice(settings.DATABASE_REPLICAS)
+        count_routing("primary_reads")
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        count_routing("writes")
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в default.
+        return True
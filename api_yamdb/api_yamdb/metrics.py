@@ -0,0 +1,397 @@
+"""
+Метрики в текстовом формате Prometheus (/metrics).
+
+MetricsMiddleware считает запросы по маршруту, методу и статусу
+и строит гистограммы времени ответа и числа запросов к БД на запрос
+(профиль запроса api_yamdb.profiling). Метрики копятся в памяти
+процесса. С METRICS_DIR (gunicorn с несколькими воркерами) каждый
+процесс раз в METRICS_FLUSH_INTERVAL секунд записывает свой снимок
+в файл <pid>.json этого каталога, /metrics складывает снимки всех
+процессов. Счётчики завершившихся воркеров сохраняются,
+yamdb_worker_info отдаётся только для живых. Каталог очищается
+при запуске gunicorn (gunicorn.conf.py).
+
+Счётчики кеша ответов и отказов ограничения частоты хранятся в кеше
+Django и читаются при выдаче: с общим для процессов CACHE_BACKEND
+они общие, с кешем в памяти - процесса, который отвечает на /metrics.
+"""
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from api.authentication import user_cache
+from api.cache import CACHED_RESOURCES
+from api.cache import get_stats as get_cache_stats
+from api.throttling import AUTH_THROTTLE_SCOPES, get_rejections
+from .db_router import get_routing_stats
+from .profiling import (
+    RequestProfile,
+    current_profile,
+    install_query_recorders,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+METRICS = {
+    "yamdb_http_requests_total": (
+        "counter",
+        "HTTP requests by route, method and status.",
+    ),
+    "yamdb_http_request_duration_seconds": (
+        "histogram",
+        "Time to build the response by route and method.",
+    ),
+    "yamdb_db_queries_per_request": (
+        "histogram",
+        "Database queries per request by route and method.",
+    ),
+    "yamdb_worker_info": ("gauge", "Live worker processes."),
+    "yamdb_worker_requests_total": (
+        "counter",
+        "HTTP requests handled by each worker process.",
+    ),
+    "yamdb_response_cache_total": (
+        "counter",
+        "Response cache hits and misses by resource.",
+    ),
+    "yamdb_auth_user_cache_total": (
+        "counter",
+        "Authenticated user cache hits and misses.",
+    ),
+    "yamdb_throttle_rejections_total": (
+        "counter",
+        "Requests rejected by auth throttles by scope.",
+    ),
+    "yamdb_db_routing_total": (
+        "counter",
+        "Database routing decisions by event.",
+    ),
+}
+
+BUCKETS = {
+    "yamdb_http_request_duration_seconds": (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    ),
+    "yamdb_db_queries_per_request": (0, 1, 2, 3, 5, 10, 20, 50, 100),
+}
+
+# Номер воркера gunicorn (gunicorn.conf.py), вне gunicorn - пустой.
+worker_id = ""
+
+flusher_pid = None
+flusher_lock = threading.Lock()
+flush_lock = threading.Lock()
+
+
+class Registry:
+    """
+    Метрики процесса: счётчики и гистограммы по имени и меткам.
+    Гистограмма хранит число значений в каждом интервале BUCKETS
+    (последний - +Inf) и сумму значений.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.dirty = False
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            self.dirty = True
+
+    def observe(self, name, labels, value):
+        buckets = BUCKETS[name]
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = [[0] * (len(buckets) + 1), 0]
+                self.histograms[key] = histogram
+            histogram[0][bisect_left(buckets, value)] += 1
+            histogram[1] += value
+            self.dirty = True
+
+    def snapshot(self):
+        """Снимок процесса для METRICS_DIR, пригодный для JSON."""
+        with self.lock:
+            self.dirty = False
+            counters = [
+                [name, labels, value]
+                for (name, labels), value in self.counters.items()
+            ]
+            histograms = [
+                [name, labels, list(counts), total]
+                for (name, labels), (counts, total) in self.histograms.items()
+            ]
+        for event, value in get_routing_stats().items():
+            counters.append(
+                ["yamdb_db_routing_total", (("event", event),), value]
+            )
+        for event, value in user_cache.stats().items():
+            counters.append(
+                ["yamdb_auth_user_cache_total", (("event", event),), value]
+            )
+        return {
+            "pid": os.getpid(),
+            "worker": worker_id,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+
+registry = Registry()
+
+
+def set_worker(identity):
+    global worker_id
+    worker_id = str(identity)
+
+
+def flush():
+    """Записывает снимок процесса в METRICS_DIR атомарной заменой."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with flush_lock:
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(registry.snapshot(), file)
+        os.replace(f"{path}.tmp", path)
+
+
+def flush_periodically():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        if registry.dirty:
+            flush()
+
+
+def start_flusher():
+    """
+    Поток записи снимков, один на процесс. Запускается на первом
+    запросе, то есть уже в воркере после fork.
+    """
+    global flusher_pid
+    with flusher_lock:
+        if flusher_pid == os.getpid():
+            return
+        flusher_pid = os.getpid()
+    threading.Thread(
+        target=flush_periodically, name="metrics-flush", daemon=True
+    ).start()
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Снимки всех процессов из METRICS_DIR, без него - этого процесса."""
+    if not settings.METRICS_DIR:
+        return [registry.snapshot()]
+    flush()
+    snapshots = []
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, "*.json")):
+        try:
+            with open(path) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def labels_key(labels):
+    return tuple(tuple(label) for label in labels)
+
+
+def merge_snapshot(values, snapshot):
+    """Добавляет снимок процесса к values, возвращает число запросов."""
+    requests = 0
+    for name, labels, value in snapshot["counters"]:
+        samples = values[name]
+        key = labels_key(labels)
+        samples[key] = samples.get(key, 0) + value
+        if name == "yamdb_http_requests_total":
+            requests += value
+    for name, labels, counts, total in snapshot["histograms"]:
+        samples = values[name]
+        key = labels_key(labels)
+        if key not in samples:
+            samples[key] = [[0] * len(counts), 0]
+        merged = samples[key]
+        for index, count in enumerate(counts):
+            merged[0][index] += count
+        merged[1] += total
+    return requests
+
+
+def aggregate(snapshots):
+    """
+    Значения метрик по имени: {метки: значение} для счётчиков
+    и показателей, {метки: [интервалы, сумма]} для гистограмм.
+    """
+    values = defaultdict(dict)
+    for snapshot in snapshots:
+        requests = merge_snapshot(values, snapshot)
+        worker = (
+            ("pid", str(snapshot["pid"])),
+            ("worker", snapshot["worker"]),
+        )
+        values["yamdb_worker_requests_total"][worker] = requests
+        if is_alive(snapshot["pid"]):
+            values["yamdb_worker_info"][worker] = 1
+    cache_values = values["yamdb_response_cache_total"]
+    for resource, events in get_cache_stats(CACHED_RESOURCES).items():
+        for event, value in events.items():
+            cache_values[(("resource", resource), ("event", event))] = value
+    throttle_values = values["yamdb_throttle_rejections_total"]
+    for scope, value in get_rejections(AUTH_THROTTLE_SCOPES).items():
+        throttle_values[(("scope", scope),)] = value
+    return values
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", r"\\")
+            .replace("\n", r"\n")
+            .replace('"', r"\""),
+        )
+        for name, value in labels
+    )
+    return f"{{{pairs}}}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(values):
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(values.get(name, {}).items()):
+            if kind != "histogram":
+                lines.append(f"{name}{format_labels(labels)} {value}")
+                continue
+            counts, total = value
+            cumulative = 0
+            bounds = (*BUCKETS[name], float("inf"))
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = format_value(float(bound))
+                lines.append(
+                    f"{name}_bucket{format_labels((*labels, ('le', le)))} "
+                    f"{cumulative}"
+                )
+            lines.append(
+                f"{name}_sum{format_labels(labels)} {format_value(total)}"
+            )
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render(aggregate(collect())), content_type=CONTENT_TYPE
+    )
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: Django видит асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        install_query_recorders()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        profile, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                current_profile.reset(token)
+        self.record(request, response, profile, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        profile, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                current_profile.reset(token)
+        self.record(request, response, profile, started)
+        return response
+
+    def start(self):
+        """Профиль запроса: общий с ProfilingMiddleware, если она есть."""
+        profile = current_profile.get()
+        if profile is not None:
+            return profile, None
+        profile = RequestProfile()
+        return profile, current_profile.set(profile)
+
+    def record(self, request, response, profile, started):
+        elapsed = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match else "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        labels = (("route", route), ("method", method))
+        registry.inc(
+            "yamdb_http_requests_total",
+            (*labels, ("status", str(response.status_code))),
+        )
+        registry.observe(
+            "yamdb_http_request_duration_seconds", labels, elapsed
+        )
+        registry.observe(
+            "yamdb_db_queries_per_request", labels, profile.queries
+        )
+        if settings.METRICS_DIR and flusher_pid != os.getpid():
+            start_flusher()
@@ -0,0 +1,67 @@
+"""
+Бэкенд PostgreSQL с пулом соединений в каждом воркере.
+Включается DB_ENGINE=api_yamdb.postgresql_pool, параметры пула -
+DATABASES[...]["POOL"]: MAX_SIZE, TIMEOUT, HEALTH_CHECK_INTERVAL.
+Django закрывает соединение в конце запроса (CONN_MAX_AGE = 0),
+вместо закрытия соединение возвращается в пул.
+"""
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from .pool import ConnectionPool, PoolTimeout, get_pool
+
+Database = base.Database
+
+
+def is_usable(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+def reset(connection):
+    """Незавершённая транзакция откатывается перед возвратом в пул."""
+    if connection.closed:
+        raise Database.InterfaceError("connection already closed")
+    status = connection.info.transaction_status
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pool(self):
+        """
+        Пул на псевдоним и имя БД: тестовый прогон переключает
+        псевдоним на другую БД, её соединения в общий пул не попадают.
+        """
+        options = self.settings_dict.get("POOL", {})
+        return get_pool(
+            f"{self.alias}:{self.settings_dict['NAME']}",
+            lambda: ConnectionPool(
+                is_usable,
+                reset,
+                lambda connection: connection.close(),
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 5),
+                health_check_interval=options.get("HEALTH_CHECK_INTERVAL", 30),
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool()
+        try:
+            connection = self.pool.acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params
+                )
+            )
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.release(self.connection)
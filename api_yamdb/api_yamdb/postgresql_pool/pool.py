@@ -0,0 +1,161 @@
+"""
+Пул соединений с БД в памяти процесса (воркера).
+
+Соединение берётся из пула на время запроса и возвращается при закрытии.
+Свободное соединение, простоявшее дольше health_check_interval,
+перед выдачей проверяется, сломанное закрывается и заменяется новым.
+Если заняты все max_size соединений, запрос ждёт освобождения
+не дольше timeout секунд.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        is_usable,
+        reset,
+        close,
+        max_size=10,
+        timeout=5,
+        health_check_interval=30,
+    ):
+        self.is_usable = is_usable
+        self.reset = reset
+        self.close = close
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        # Свободные соединения: (соединение, время возврата в пул).
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+        self.counters = dict.fromkeys(
+            (
+                "acquired",
+                "created",
+                "discarded",
+                "health_check_failures",
+                "waits",
+                "timeouts",
+            ),
+            0,
+        )
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def acquire(self, connect):
+        """Свободное соединение из пула или новое от connect()."""
+        deadline = started = time.monotonic()
+        deadline += self.timeout
+        waited = False
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Все {self.max_size} соединений пула заняты "
+                            f"дольше {self.timeout} с"
+                        )
+                    waited = True
+                    self.condition.wait(remaining)
+                if waited:
+                    wait_time = time.monotonic() - started
+                    self.counters["waits"] += 1
+                    self.wait_time += wait_time
+                    self.max_wait_time = max(self.max_wait_time, wait_time)
+                    waited = False
+                if self.idle:
+                    connection, released_at = self.idle.pop()
+                else:
+                    connection = None
+                    self.size += 1
+            if connection is None:
+                return self.create(connect)
+            if self.check(connection, released_at):
+                with self.condition:
+                    self.counters["acquired"] += 1
+                return connection
+            self.discard(connection)
+            with self.condition:
+                self.counters["health_check_failures"] += 1
+
+    def create(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.counters["acquired"] += 1
+            self.counters["created"] += 1
+        return connection
+
+    def check(self, connection, released_at):
+        if time.monotonic() - released_at < self.health_check_interval:
+            return True
+        try:
+            return self.is_usable(connection)
+        except Exception:
+            return False
+
+    def release(self, connection):
+        """Возвращает соединение в пул, сломанное закрывается."""
+        try:
+            self.reset(connection)
+        except Exception:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        try:
+            self.close(connection)
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            self.counters["discarded"] += 1
+            self.condition.notify()
+
+    def stats(self):
+        with self.condition:
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                **self.counters,
+                "wait_time": round(self.wait_time, 6),
+                "max_wait_time": round(self.max_wait_time, 6),
+            }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """Пул по ключу, создаётся factory при первом обращении."""
+    with pools_lock:
+        if key not in pools:
+            pools[key] = factory()
+        return pools[key]
+
+
+def get_stats():
+    """Метрики пулов по ключам "псевдоним:имя БД"."""
+    with pools_lock:
+        return {key: pool.stats() for key, pool in pools.items()}
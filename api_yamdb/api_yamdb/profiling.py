@@ -0,0 +1,243 @@
+"""
+Профилирование запросов (REQUEST_PROFILING).
+
+ProfilingMiddleware считает для каждого запроса число запросов к БД
+и их время (обёртка execute_wrappers соединений), время сериализации
+и общее время. Итог отдаётся в заголовке Server-Timing и пишется
+строкой JSON в лог api_yamdb.profiling. Время сериализации включает
+ленивые запросы к БД, которые сериализатор делает сам.
+
+Доля запросов REQUEST_PROFILING_SAMPLE_RATE выполняется под cProfile,
+дамп pstats сохраняется в REQUEST_PROFILING_DIR с именем представления
+(например, TitleViewSet.list). Запрос дольше REQUEST_PROFILING_SLOW_MS
+отмечается по методу и адресу с параметрами: профилируется его повтор,
+другие запросы к тому же представлению - нет. Отметки хранятся
+в памяти процесса, не больше ARMED_REQUESTS_SIZE последних.
+Под ASGI cProfile охватывает только представления пула чтения
+(api.async_views), для остальных дамп не пишется.
+"""
+import asyncio
+import cProfile
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Профиль текущего запроса, None - запрос не профилируется.
+current_profile = ContextVar("current_profile", default=None)
+
+ARMED_REQUESTS_SIZE = 1000
+
+# Медленные запросы, повтор которых профилируется.
+armed_requests = OrderedDict()
+armed_lock = threading.Lock()
+
+dump_numbers = itertools.count()
+
+
+class RequestProfile:
+    def __init__(self, profiler=None):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.profiler = profiler
+        self.profiling = False
+        self.profiled = False
+
+    def run(self, function, *args):
+        """
+        function(*args) под cProfile, если запрос профилируется.
+        Профилировщик не включается второй раз, пока уже работает.
+        """
+        if self.profiler is None or self.profiling:
+            return function(*args)
+        self.profiling = True
+        self.profiled = True
+        try:
+            return self.profiler.runcall(function, *args)
+        finally:
+            self.profiling = False
+
+
+def run_profiled(function, *args):
+    """function(*args) под cProfile текущего запроса, если он есть."""
+    profile = current_profile.get()
+    if profile is None:
+        return function(*args)
+    return profile.run(function, *args)
+
+
+def timed_serialization(function, *args):
+    """
+    Время function(*args) учитывается как сериализация,
+    вложенные сериализаторы не учитываются повторно.
+    """
+    profile = current_profile.get()
+    if profile is None or profile.serializing:
+        return function(*args)
+    profile.serializing = True
+    started = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        profile.serializer_time += time.perf_counter() - started
+        profile.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_time += time.perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs):
+    # Сигнал приходит при каждом переподключении того же объекта.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorders():
+    """Обёртка для новых соединений и уже открытых в этом потоке."""
+    connection_created.connect(install_query_recorder)
+    for connection in connections.all():
+        install_query_recorder(connection)
+
+
+def get_view_name(match, method):
+    """Имя представления для дампа: класс и действие или метод."""
+    view = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", None
+    )
+    if view is None:
+        return match.func.__name__
+    method = method.lower()
+    actions = getattr(match.func, "actions", None) or {}
+    return f"{view.__name__}.{actions.get(method, method)}"
+
+
+def get_request_key(request):
+    return f"{request.method} {request.get_full_path()}"
+
+
+def arm_request(key):
+    with armed_lock:
+        armed_requests[key] = True
+        armed_requests.move_to_end(key)
+        while len(armed_requests) > ARMED_REQUESTS_SIZE:
+            armed_requests.popitem(last=False)
+
+
+def disarm_request(key):
+    with armed_lock:
+        return armed_requests.pop(key, False)
+
+
+def dump_profile(profiler, view):
+    directory = settings.REQUEST_PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(
+        directory,
+        f"{view}.{int(time.time())}.{os.getpid()}.{next(dump_numbers)}"
+        ".pstats",
+    )
+    profiler.dump_stats(path)
+    return path
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: Django видит асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        install_query_recorders()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        profile = self.start(request)
+        token = current_profile.set(profile)
+        try:
+            response = profile.run(self.get_response, request)
+        finally:
+            current_profile.reset(token)
+        self.finish(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        profile = self.start(request)
+        token = current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        self.finish(request, response, profile)
+        return response
+
+    def is_armed(self, request):
+        if not armed_requests:
+            return False
+        return disarm_request(get_request_key(request))
+
+    def start(self, request):
+        profiler = None
+        if (
+            random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE
+            or self.is_armed(request)
+        ):
+            profiler = cProfile.Profile()
+        return RequestProfile(profiler)
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        match = getattr(request, "resolver_match", None)
+        view = get_view_name(match, request.method) if match else None
+        response["Server-Timing"] = (
+            f"db;dur={profile.db_time * 1e3:.2f};"
+            f'desc="{profile.queries} queries", '
+            f"serializer;dur={profile.serializer_time * 1e3:.2f}, "
+            f"total;dur={total * 1e3:.2f}"
+        )
+        dump = None
+        if view is not None:
+            if profile.profiled:
+                dump = dump_profile(profile.profiler, view)
+            elif total * 1e3 >= settings.REQUEST_PROFILING_SLOW_MS:
+                arm_request(get_request_key(request))
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "view": view,
+                    "status": response.status_code,
+                    "queries": profile.queries,
+                    "db_ms": round(profile.db_time * 1e3, 2),
+                    "serializer_ms": round(profile.serializer_time * 1e3, 2),
+                    "total_ms": round(total * 1e3, 2),
+                    "profile": dump,
+                }
+            )
+        )
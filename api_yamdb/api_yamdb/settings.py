@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api_yamdb.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -37,10 +38,60 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api_yamdb.db_router.ReplicaRoutingMiddleware",
 ]
 
+# Профилирование запросов (api_yamdb.profiling): Server-Timing, строка
+# лога и дампы cProfile для доли запросов и медленных представлений
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', default='False') == 'True'
+
+if REQUEST_PROFILING:
+    MIDDLEWARE.insert(0, 'api_yamdb.profiling.ProfilingMiddleware')
+
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_PROFILING_SAMPLE_RATE', default=0)
+)
+
+REQUEST_PROFILING_SLOW_MS = int(
+    os.getenv('REQUEST_PROFILING_SLOW_MS', default=500)
+)
+
+REQUEST_PROFILING_DIR = Path(
+    os.getenv('REQUEST_PROFILING_DIR', default=BASE_DIR / 'profiles')
+)
+
+# Метрики Prometheus (api_yamdb.metrics, /metrics): процессы gunicorn
+# пишут снимки в METRICS_DIR (gunicorn.conf.py задаёт его сам),
+# /metrics складывает снимки всех процессов
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+
+METRICS_FLUSH_INTERVAL = float(
+    os.getenv('METRICS_FLUSH_INTERVAL', default=1)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api_yamdb.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = "api_yamdb.urls"
 
+# ASGI (api_yamdb.asgi включает сам): чтение произведений, отзывов
+# и комментариев в пуле из ASGI_READ_THREADS потоков (api.async_views)
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', default='False') == 'True'
+
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=8))
+
 TEMPLATES_DIR = BASE_DIR / "templates"
 TEMPLATES = [
     {
@@ -70,10 +121,86 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Постоянные соединения: секунды жизни, 0 - закрывать после запроса
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+        # Пул соединений воркера для DB_ENGINE=api_yamdb.postgresql_pool
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'HEALTH_CHECK_INTERVAL': float(
+                os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', default=30)
+            ),
+        },
+    }
+}
+
+
+# Реплики для чтения (api_yamdb.db_router): через запятую адреса серверов
+# PostgreSQL, для SQLite - пути к копиям файла БД
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(','))
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica.strip()
+    else:
+        DATABASES[alias]['HOST'] = replica.strip()
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api_yamdb.db_router.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает из default
+DATABASE_REPLICA_PIN_SECONDS = int(
+    os.getenv('DB_REPLICA_PIN_SECONDS', default=10)
+)
+
+# Покрывающие индексы (include) работают в PostgreSQL, SQLite их колонки
+# пропускает - для разработки на SQLite этого достаточно, предупреждение
+# отключается только для неё
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+# JWT: refresh-токен обновляется при каждом обновлении access-токена,
+# с JWT_BLACKLIST использованный refresh-токен больше не принимается
+JWT_BLACKLIST = os.getenv('JWT_BLACKLIST', default='False') == 'True'
+
+if JWT_BLACKLIST:
+    INSTALLED_APPS.append("rest_framework_simplejwt.token_blacklist")
+
+SIMPLE_JWT = {
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": JWT_BLACKLIST,
+}
+
+# Кеш пользователей JWT-аутентификации в памяти процесса
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', default=1024))
+
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60))
+
+# Роль из полей токена без запроса к БД (действует до истечения токена)
+JWT_TRUST_ROLE_CLAIMS = (
+    os.getenv('JWT_TRUST_ROLE_CLAIMS', default='False') == 'True'
+)
+
 
 # Password validation
 AUTH_USER_MODEL = "reviews.User"
@@ -125,6 +252,28 @@ EMAIL_SUBJECT = "Yamdb registration"
 
 EMAIL_SENDER = "from@example.com"
 
+# Срок действия кода подтверждения из письма в секундах
+
+CONFIRMATION_CODE_TIMEOUT = int(
+    os.getenv('CONFIRMATION_CODE_TIMEOUT', default=60 * 60 * 24)
+)
+
+# Очередь писем (reviews.outbox), отправляет manage.py send-emails
+
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100))
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+)
+
+# Пауза перед повтором в секундах, удваивается с каждой попыткой
+EMAIL_OUTBOX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_BACKOFF', default=30))
+
+# Сколько секунд забранные воркером письма не выдаются другим воркерам
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(
+    os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', default=300)
+)
+
 
 # Rest framework staff
 
@@ -133,11 +282,26 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
+    # Перед приложением один nginx, он передаёт адрес клиента
+    # в X-Forwarded-For: заголовок от клиента не учитывается
+    "NUM_PROXIES": int(os.getenv('NUM_PROXIES', default=1)),
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.getenv('AUTH_THROTTLE_IP_RATE', default='20/min'),
+        "auth_username": os.getenv(
+            'AUTH_THROTTLE_USERNAME_RATE', default='5/min'
+        ),
+    },
 }
+
+# Хранилище корзин ограничения частоты (api.throttling): local - память
+# процесса, cache - общий кеш CACHES
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', default='local')
+
+THROTTLE_LOCAL_SIZE = int(os.getenv('THROTTLE_LOCAL_SIZE', default=10000))
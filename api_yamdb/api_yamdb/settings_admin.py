@@ -0,0 +1,8 @@
+"""
+Профиль воркеров админки и документации (/admin/, /redoc/):
+приложения и middleware полного профиля, без маршрутов API.
+DJANGO_SETTINGS_MODULE=api_yamdb.settings_admin
+"""
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = "api_yamdb.urls_admin"
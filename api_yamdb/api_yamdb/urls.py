@@ -1,13 +1,4 @@
-from django.contrib import admin
-from django.urls import include, path
-from django.views.generic import TemplateView
+from . import urls_admin, urls_api
 
-urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("api/", include("api.urls")),
-    path(
-        "redoc/",
-        TemplateView.as_view(template_name="redoc.html"),
-        name="redoc",
-    ),
-]
+# Полный профиль: маршруты профилей админки и API вместе.
+urlpatterns = urls_admin.urlpatterns + urls_api.urlpatterns
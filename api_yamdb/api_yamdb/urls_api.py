@@ -0,0 +1,8 @@
+from django.urls import include, path
+
+from .metrics import metrics_view
+
+urlpatterns = [
+    path("api/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
+]
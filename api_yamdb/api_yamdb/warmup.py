@@ -0,0 +1,92 @@
+"""
+Прогрев воркера до приёма запросов (gunicorn.conf.py).
+warm_up строит то, что иначе строится на первом запросе: разрешение
+адресов, поля сериализаторов представлений API и планы чтения.
+БД при этом не нужна, поэтому с preload_app прогрев выполняется
+один раз в мастере и достаётся воркерам при fork. Соединения с БД открываются
+в каждом воркере (warm_up_worker), только если они переживают запрос:
+постоянные (CONN_MAX_AGE) или из пула api_yamdb.postgresql_pool.
+С CONN_MAX_AGE = 0 Django закрыл бы такое соединение после первого
+запроса, и прогрев только добавил бы лишнее подключение.
+"""
+from django.db import connections
+from django.http import HttpRequest
+from django.urls import URLPattern, get_resolver
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+
+
+def warm_up_urls():
+    resolver = get_resolver()
+    # reverse_dict заполняет словари всех вложенных urlconf.
+    resolver.reverse_dict
+
+
+def get_view_serializers():
+    """
+    Сериализаторы представлений API: serializer_class или выбор
+    get_serializer_class для чтения и для записи.
+    """
+    from api import urls as api_urls
+
+    view_classes = [viewset for _, viewset, _ in api_urls.router.registry]
+    view_classes += [
+        pattern.callback.view_class
+        for pattern in api_urls.urlpatterns
+        if isinstance(pattern, URLPattern)
+    ]
+    serializer_classes = set()
+    for view_class in view_classes:
+        if not issubclass(view_class, GenericAPIView):
+            serializer_class = getattr(view_class, "serializer_class", None)
+            if serializer_class is not None:
+                serializer_classes.add(serializer_class)
+            continue
+        for method in ("GET", "POST"):
+            http_request = HttpRequest()
+            http_request.method = method
+            view = view_class(kwargs={}, format_kwarg=None)
+            view.request = Request(http_request)
+            serializer_classes.add(view.get_serializer_class())
+    return serializer_classes
+
+
+def warm_up_serializers():
+    for serializer_class in get_view_serializers():
+        serializer_class().fields
+
+
+def warm_up_read_plans():
+    from api.mixins import FastReadMixin
+    from api.urls import router
+
+    http_request = HttpRequest()
+    http_request.method = "GET"
+    for _, viewset, _ in router.registry:
+        if issubclass(viewset, FastReadMixin):
+            view = viewset(action="list", kwargs={}, format_kwarg=None)
+            view.request = Request(http_request)
+            view.get_read_plan()
+
+
+def warm_up():
+    warm_up_urls()
+    warm_up_serializers()
+    warm_up_read_plans()
+
+
+POOL_ENGINE = "api_yamdb.postgresql_pool"
+
+
+def keeps_connection(connection):
+    settings_dict = connection.settings_dict
+    return (
+        settings_dict["ENGINE"] == POOL_ENGINE
+        or settings_dict["CONN_MAX_AGE"] != 0
+    )
+
+
+def warm_up_worker():
+    for connection in connections.all():
+        if keeps_connection(connection):
+            connection.ensure_connection()
@@ -0,0 +1,44 @@
+"""
+Настройки gunicorn, читаются из рабочего каталога автоматически.
+Приложение загружается и прогревается в мастере до запуска воркеров,
+воркер открывает соединения с БД до приёма запросов.
+Снимки метрик воркеров пишутся в METRICS_DIR (api_yamdb.metrics),
+каталог очищается при запуске.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "yamdb-metrics")
+)
+
+preload_app = True
+
+workers = int(os.getenv("GUNICORN_WORKERS", default=2))
+
+
+def on_starting(server):
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+
+
+def when_ready(server):
+    from api_yamdb.warmup import warm_up
+
+    warm_up()
+
+
+def post_worker_init(worker):
+    from api_yamdb.metrics import flush, set_worker
+    from api_yamdb.warmup import warm_up_worker
+
+    set_worker(worker.age)
+    warm_up_worker()
+    # Воркер виден в yamdb_worker_info до первого запроса.
+    flush()
+
+
+def worker_exit(server, worker):
+    from api_yamdb.metrics import flush
+
+    flush()
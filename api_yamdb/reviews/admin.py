@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    OutboxEmail,
+    Review,
+    Title,
+    User,
+)
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -41,7 +50,7 @@ class TitleAdmin(admin.ModelAdmin):
     """
 
     inlines = [GenreInline]
-    list_display = ("id", "category", "name", "year", "description")
+    list_display = ("id", "category", "name", "year", "rating", "description")
     search_fields = ("name",)
     filter_horizontal = ("genre",)
     list_filter = ("name", "year", "category", "genre")
@@ -70,9 +79,29 @@ class CommentAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """
+    Админ-модель для очереди писем.
+    """
+
+    list_display = (
+        "id",
+        "to",
+        "subject",
+        "created_at",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    search_fields = ("to",)
+    list_filter = ("sent_at",)
+    empty_value_display = "-пусто-"
+
+
 admin.site.register(User)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
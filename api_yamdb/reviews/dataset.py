@@ -0,0 +1,95 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+
+MODEL_AND_FILE_TABLE = {
+    User: "users.csv",
+    Category: "category.csv",
+    Genre: "genre.csv",
+    Title: "titles.csv",
+    GenreTitle: "genre_title.csv",
+    Review: "review.csv",
+    Comment: "comments.csv",
+}
+
+# Колонки выгрузки в том же виде, в каком их читает load-data.
+EXPORT_COLUMNS = {
+    User: (
+        "id",
+        "username",
+        "email",
+        "role",
+        "bio",
+        "first_name",
+        "last_name",
+    ),
+    Category: ("id", "name", "slug"),
+    Genre: ("id", "name", "slug"),
+    Title: ("id", "name", "year", "category", "description"),
+    GenreTitle: ("id", "title_id", "genre_id"),
+    Review: ("id", "title_id", "text", "author", "score", "pub_date"),
+    Comment: ("id", "review_id", "text", "author", "pub_date"),
+}
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def get_export_model(table):
+    """Модель по имени файла без расширения: titles, review, ..."""
+    for model, file in MODEL_AND_FILE_TABLE.items():
+        if file.rsplit(".", 1)[0] == table:
+            return model
+    return None
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(model, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    """
+    Строки таблицы по возрастанию id. iterator() читает их пачками
+    через серверный курсор, память не зависит от размера таблицы.
+    """
+    return (
+        model.objects.using(using)
+        .order_by("pk")
+        .values_list(*EXPORT_COLUMNS[model])
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def export_lines(
+    model, export_format, chunk_size=EXPORT_CHUNK_SIZE, using=None
+):
+    """Построчная выгрузка таблицы в csv (с заголовком) или ndjson."""
+    columns = EXPORT_COLUMNS[model]
+    rows = export_rows(model, chunk_size, using)
+    if export_format == "csv":
+        writer = csv.writer(Echo(), lineterminator="\n")
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield (
+                json.dumps(
+                    dict(zip(columns, row)),
+                    cls=DjangoJSONEncoder,
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
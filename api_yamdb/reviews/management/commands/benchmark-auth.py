@@ -0,0 +1,125 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from api.tokens import confirmation_code_generator, get_tokens_for_user
+from reviews.models import OutboxEmail, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Стоимость кода подтверждения на одном ядре.
+    Сравнивает прежнюю схему (код хешируется set_password
+    и проверяется хешером паролей) с HMAC-кодом, затем меряет
+    запросы в секунду для signup и получения токена и для обновления
+    токена по refresh-токену. Все изменения в БД откатываются.
+    """
+
+    help = "Benchmark confirmation codes and token refresh per core"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Signup/token pairs and refreshes to run (default: 50)",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests должен быть больше нуля")
+        # Ограничение частоты auth в замер не входит.
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {},
+        }
+        try:
+            with transaction.atomic(), override_settings(
+                REST_FRAMEWORK=rest_framework
+            ):
+                self.benchmark(options["requests"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def rate(self, name, count, function):
+        started = time.perf_counter()
+        for _ in range(count):
+            function()
+        rate = count / (time.perf_counter() - started)
+        self.stdout.write(f"{name:<34} {rate:>10.1f} в секунду")
+        return rate
+
+    def benchmark(self, count):
+        user = User.objects.create(username="benchmark", email="b@b.fake")
+        code = default_token_generator.make_token(user)
+        encoded = make_password(code)
+        old = self.rate(
+            "set_password + check_password",
+            count,
+            lambda: check_password(code, make_password(code)),
+        )
+        self.rate(
+            "  из них check_password",
+            count,
+            lambda: check_password(code, encoded),
+        )
+        new = self.rate(
+            "make_token + check_token (HMAC)",
+            count,
+            lambda: confirmation_code_generator.check_token(
+                user, confirmation_code_generator.make_token(user)
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Проверка кода быстрее в {new / old:.0f} раз")
+        )
+
+        client = Client()
+        users = iter(range(count))
+
+        def signup_and_token():
+            number = next(users)
+            username = f"benchmark_{number}"
+            client.post(
+                "/api/v1/auth/signup/",
+                {"username": username, "email": f"{username}@b.fake"},
+            )
+            code = (
+                OutboxEmail.objects.latest("id").body.split(":", 1)[1].strip()
+            )
+            response = client.post(
+                "/api/v1/auth/token/",
+                {"username": username, "confirmation_code": code},
+            )
+            if response.status_code != 200:
+                raise CommandError(f"Токен не выдан: {response.content}")
+
+        full = self.rate(
+            "signup + token, пар запросов", count, signup_and_token
+        )
+
+        tokens = {"refresh": str(get_tokens_for_user(user))}
+
+        def refresh_token():
+            response = client.post("/api/v1/auth/token/refresh/", tokens)
+            if response.status_code != 200:
+                raise CommandError(f"Токен не обновлён: {response.content}")
+            tokens["refresh"] = response.json()["refresh"]
+
+        refresh = self.rate("token/refresh, запросов", count, refresh_token)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обновление токена быстрее повторного входа "
+                f"в {refresh / full:.1f} раз"
+            )
+        )
@@ -0,0 +1,161 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+PROFILES = {
+    "full": "api_yamdb.settings",
+    "api": "api_yamdb.settings_api",
+    "admin": "api_yamdb.settings_admin",
+}
+
+# Замер в отдельном процессе: каждый профиль импортируется с нуля.
+MEASURE = """
+import io
+import json
+import sys
+import time
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+imported = time.perf_counter()
+
+from api_yamdb.warmup import warm_up
+
+warm_up()
+warmed = time.perf_counter()
+
+
+def rss():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+memory = rss()
+path, count = sys.argv[1], int(sys.argv[2])
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": path,
+    "QUERY_STRING": "",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80",
+    "wsgi.url_scheme": "http",
+}
+from reviews.models import User
+
+user = User.objects.order_by("pk").first()
+if user is not None:
+    from api.tokens import get_tokens_for_user
+
+    token = get_tokens_for_user(user).access_token
+    environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+statuses = set()
+
+
+def start_response(status, headers):
+    statuses.add(status)
+
+
+def request():
+    response = application(
+        {**environ, "wsgi.input": io.BytesIO()}, start_response
+    )
+    b"".join(response)
+    response.close()
+
+
+for _ in range(count // 10 + 1):
+    request()
+best = float("inf")
+for _ in range(5):
+    requests_started = time.perf_counter()
+    for _ in range(count):
+        request()
+    best = min(best, (time.perf_counter() - requests_started) / count)
+print(
+    json.dumps(
+        {
+            "import": imported - started,
+            "warm_up": warmed - imported,
+            "rss": memory,
+            "request": best,
+            "statuses": sorted(statuses),
+        }
+    )
+)
+"""
+
+
+class Command(BaseCommand):
+    """
+    Сравнение профилей настроек: время импорта приложения, прогрева,
+    память процесса после прогрева и время обработки запроса WSGI
+    без сети (middleware, DRF и кеш ответов). Запрос выполняется
+    от имени первого пользователя с JWT, если он есть в БД,
+    профиль admin запрашивает страницу входа в админку.
+    """
+
+    help = "Measure import time, RSS and request overhead per profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "profiles",
+            nargs="*",
+            help=f"Profiles: {', '.join(PROFILES)} (default: all)",
+        )
+        parser.add_argument(
+            "--path",
+            default="/api/v1/categories/",
+            help="Path to request (default: /api/v1/categories/)",
+        )
+        parser.add_argument(
+            "--admin-path",
+            default="/admin/login/",
+            help="Path to request in the admin profile "
+            "(default: /admin/login/)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per run, the best of 5 runs is reported "
+            "(default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests должен быть больше нуля")
+        for profile in options["profiles"]:
+            if profile not in PROFILES:
+                raise CommandError(f"Неизвестный профиль: {profile}")
+        for profile in options["profiles"] or PROFILES:
+            path = options["admin_path" if profile == "admin" else "path"]
+            self.measure(profile, path, options["requests"])
+
+    def measure(self, profile, path, requests):
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE, path, str(requests)],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": PROFILES[profile]},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"{profile}: {result.stderr.strip()}")
+        data = json.loads(result.stdout.splitlines()[-1])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{profile:<6} импорт {data['import'] * 1e3:6.0f} мс, "
+                f"прогрев {data['warm_up'] * 1e3:5.0f} мс, "
+                f"память {data['rss']:5.1f} МиБ, "
+                f"запрос {data['request'] * 1e6:7.0f} мкс "
+                f"({', '.join(data['statuses'])})"
+            )
+        )
@@ -0,0 +1,114 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.readers import get_read_plan
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleReadOnlySerializer,
+)
+from reviews.models import Comment, Review, Title
+
+BENCHMARKS = {
+    "titles": (
+        TitleReadOnlySerializer,
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("pk"),
+    ),
+    "reviews": (
+        ReviewSerializer,
+        Review.objects.select_related("author").order_by("pk"),
+    ),
+    "comments": (
+        CommentSerializer,
+        Comment.objects.select_related("author").order_by("pk"),
+    ),
+}
+
+
+class Command(BaseCommand):
+    """
+    Сравнение сериализаторов DRF и скомпилированных планов чтения
+    на данных из БД: время на строку с запросами и без них
+    (сборка по плану включает запрос вложенных списков).
+    Заодно проверяет, что JSON обоих путей совпадает побайтово.
+    """
+
+    help = "Benchmark DRF serializers against compiled read plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "resources",
+            nargs="*",
+            help=f"Resources to benchmark: {', '.join(BENCHMARKS)} "
+            "(default: all)",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000,
+            help="Rows per page (default: 1000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per path, the best one is reported (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows и --repeat должны быть больше нуля")
+        for resource in options["resources"]:
+            if resource not in BENCHMARKS:
+                raise CommandError(f"Неизвестный ресурс: {resource}")
+        for resource in options["resources"] or BENCHMARKS:
+            self.benchmark(resource, options["rows"], options["repeat"])
+
+    def benchmark(self, resource, rows, repeat):
+        serializer_class, queryset = BENCHMARKS[resource]
+        plan = get_read_plan(serializer_class)
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            objects = list(queryset[:rows])
+            started = time.perf_counter()
+            data = serializer_class(objects, many=True).data
+            return data, time.perf_counter() - started
+
+        def plan_path():
+            page = list(plan.rows(queryset)[:rows])
+            started = time.perf_counter()
+            data = plan.build(page)
+            return data, time.perf_counter() - started
+
+        results = {}
+        paths = (("serializer", serializer_path), ("plan", plan_path))
+        for name, path in paths:
+            best_total = best_build = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                data, build = path()
+                total = time.perf_counter() - started
+                best_total = min(best_total, total)
+                best_build = min(best_build, build)
+            results[name] = (renderer.render(data), best_total, best_build)
+
+        count = max(len(data), 1)
+        if results["serializer"][0] != results["plan"][0]:
+            raise CommandError(f"{resource}: ответы путей различаются")
+        for name, (_, total, build) in results.items():
+            self.stdout.write(
+                f"{resource:<9} {name:<10} "
+                f"{build / count * 1e6:>8.1f} мкс/строку "
+                f"{total / count * 1e6:>8.1f} мкс/строку с запросами"
+            )
+        speedup = results["serializer"][2] / max(results["plan"][2], 1e-9)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resource}: {count} строк, ускорение сборки x{speedup:.1f}"
+            )
+        )
@@ -0,0 +1,267 @@
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# Хук gunicorn: задержка каждого запроса к БД, как у удалённого сервера.
+GUNICORN_CONFIG = """
+import time
+
+DB_LATENCY = {latency}
+
+
+def post_worker_init(worker):
+    from django.db.backends.signals import connection_created
+
+    def slow_execute(execute, sql, params, many, context):
+        time.sleep(DB_LATENCY)
+        return execute(sql, params, many, context)
+
+    def add_latency(connection, **kwargs):
+        # Сигнал приходит при каждом переподключении того же объекта.
+        if slow_execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(slow_execute)
+
+    connection_created.connect(add_latency, weak=False)
+"""
+
+DEPLOYMENTS = {
+    "wsgi": ["api_yamdb.wsgi:application"],
+    "asgi": [
+        "api_yamdb.asgi:application",
+        "--worker-class",
+        "uvicorn.workers.UvicornWorker",
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree(pid):
+    pids = [pid]
+    for child in open(f"/proc/{pid}/task/{pid}/children").read().split():
+        pids.extend(process_tree(int(child)))
+    return pids
+
+
+def process_rss(pid):
+    """Память процесса в МиБ (Linux)."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0
+
+
+def rss(pid):
+    """Память процесса и его потомков в МиБ."""
+    return sum(process_rss(tree_pid) for tree_pid in process_tree(pid))
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class Command(BaseCommand):
+    """
+    Сравнение развёртываний gunicorn с синхронными воркерами (WSGI)
+    и с воркерами uvicorn (ASGI, чтение в пуле потоков) при одинаковой
+    памяти: пропускная способность, p50/p99 и память.
+    WSGI запускается с --workers, число воркеров ASGI подбирается
+    так, чтобы их память была ближе всего к памяти WSGI под нагрузкой:
+    пробный запуск с одним воркером измеряет память мастера и воркера.
+    Подбор приблизительный, итоговая память обоих развёртываний
+    выводится. --equal-workers сравнивает при одинаковом числе воркеров.
+    --db-latency добавляет задержку к каждому запросу к БД, чтобы
+    локальная БД вела себя как удалённый сервер.
+    """
+
+    help = (
+        "Benchmark sync WSGI workers against ASGI async read views "
+        "at equal memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/v1/titles/1/reviews/",
+            help="Path to request (default: /api/v1/titles/1/reviews/)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="WSGI worker processes (default: 2)",
+        )
+        parser.add_argument(
+            "--equal-workers",
+            action="store_true",
+            help="Run ASGI with --workers instead of sizing it to WSGI RSS",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Concurrent clients (default: 32)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Requests per deployment (default: 1000)",
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=5,
+            help="Added latency per DB query in ms (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        for option in ("workers", "concurrency", "requests"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} должен быть больше нуля")
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".py", prefix="gunicorn_"
+        ) as config:
+            config.write(
+                GUNICORN_CONFIG.format(latency=options["db_latency"] / 1000)
+            )
+            config.flush()
+            memory = self.benchmark(
+                "wsgi", config.name, options["workers"], options
+            )
+            workers = options["workers"]
+            if not options["equal_workers"]:
+                workers = self.size_workers(
+                    "asgi", config.name, memory, options
+                )
+            self.benchmark("asgi", config.name, workers, options)
+
+    @contextmanager
+    def server(self, name, config, workers, options):
+        """Развёртывание name на свободном порту, отдаёт (pid, порт)."""
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                *DEPLOYMENTS[name],
+                "--config",
+                config,
+                "--workers",
+                str(workers),
+                "--bind",
+                f"127.0.0.1:{port}",
+                "--log-level",
+                "warning",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "ASYNC_READ_VIEWS": str(name == "asgi")},
+        )
+        try:
+            self.wait_ready(port, options["path"])
+            # Прогрев: соединения с БД и кеши воркеров.
+            self.run_load(
+                port,
+                options["path"],
+                options["concurrency"] * 2,
+                options["concurrency"],
+            )
+            yield server.pid, port
+        finally:
+            server.terminate()
+            server.wait()
+
+    def size_workers(self, name, config, memory, options):
+        """Число воркеров name, память которых ближе всего к memory МиБ."""
+        with self.server(name, config, 1, options) as (pid, _):
+            master = process_rss(pid)
+            worker = rss(pid) - master
+        workers = max(1, round((memory - master) / worker))
+        self.stdout.write(
+            f"{name}: мастер {master:.0f} МиБ, воркер {worker:.0f} МиБ, "
+            f"воркеров на {memory:.0f} МиБ: {workers}"
+        )
+        return workers
+
+    def benchmark(self, name, config, workers, options):
+        with self.server(name, config, workers, options) as (pid, port):
+            started = time.perf_counter()
+            latencies, errors = self.run_load(
+                port,
+                options["path"],
+                options["requests"],
+                options["concurrency"],
+            )
+            elapsed = time.perf_counter() - started
+            memory = rss(pid)
+        latencies.sort()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name}: воркеров {workers}, "
+                f"{len(latencies) / elapsed:8.1f} запросов/с, "
+                f"p50 {percentile(latencies, 0.5) * 1e3:7.1f} мс, "
+                f"p99 {percentile(latencies, 0.99) * 1e3:7.1f} мс, "
+                f"ошибок {errors}, память {memory:.0f} МиБ"
+            )
+        )
+        return memory
+
+    def wait_ready(self, port, path, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port)
+                connection.request("GET", path)
+                connection.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Сервер на порту {port} не запустился")
+
+    def run_load(self, port, path, requests, concurrency):
+        def client(count):
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            latencies = []
+            errors = 0
+            for _ in range(count):
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        errors += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection("127.0.0.1", port)
+                latencies.append(time.perf_counter() - started)
+            return latencies, errors
+
+        counts = [requests // concurrency] * concurrency
+        for number in range(requests % concurrency):
+            counts[number] += 1
+        latencies = []
+        errors = 0
+        with ThreadPoolExecutor(concurrency) as executor:
+            for client_latencies, client_errors in executor.map(
+                client, counts
+            ):
+                latencies.extend(client_latencies)
+                errors += client_errors
+        return latencies, errors
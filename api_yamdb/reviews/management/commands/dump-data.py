@@ -0,0 +1,95 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.dataset import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    MODEL_AND_FILE_TABLE,
+    export_lines,
+    get_export_model,
+)
+
+
+class Command(BaseCommand):
+    """
+    Выгрузка таблиц в файлы того же формата, что читает load-data,
+    или в ndjson. Строки читаются пачками через серверный курсор
+    и сразу пишутся в файл.
+    """
+
+    help = "Export Django db tables to csv or ndjson files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tables",
+            nargs="*",
+            help="Tables to export by file name: titles, review, ... "
+            "(default: all)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="csv",
+            dest="export_format",
+            help="Output format (default: csv)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f"Rows fetched per query (default: {EXPORT_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=f"{settings.BASE_DIR}/static/data",
+            help="Directory to write files to",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to export from",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size должен быть больше нуля")
+        models = list(MODEL_AND_FILE_TABLE)
+        if options["tables"]:
+            models = [self.get_model(table) for table in options["tables"]]
+        export_format = options["export_format"]
+        os.makedirs(options["output_dir"], exist_ok=True)
+
+        for model in models:
+            started = time.monotonic()
+            name = MODEL_AND_FILE_TABLE[model].rsplit(".", 1)[0]
+            path = os.path.join(
+                options["output_dir"], f"{name}.{export_format}"
+            )
+            rows = 0
+            with open(path, "w", encoding="utf-8") as file:
+                for line in export_lines(
+                    model,
+                    export_format,
+                    options["chunk_size"],
+                    options["database"],
+                ):
+                    file.write(line)
+                    rows += 1
+            if export_format == "csv":
+                rows -= 1
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model.__name__}: {rows} строк -> {path} "
+                    f"за {time.monotonic() - started:.1f} с"
+                )
+            )
+
+    def get_model(self, table):
+        model = get_export_model(table)
+        if model is None:
+            raise CommandError(f"Неизвестная таблица: {table}")
+        return model
@@ -0,0 +1,220 @@
+import re
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
+
+# Таблицы, которые горячие запросы должны читать по индексу.
+HOT_QUERIES = {
+    "reviews of title": (
+        "reviews_review",
+        lambda ids: Review.objects.filter(title=ids["title"])[:10],
+    ),
+    "reviews version": (
+        "reviews_review",
+        lambda ids: Review.objects.filter(title=ids["title"])
+        .order_by()
+        .values("title")
+        .annotate(count=Count("pk"), updated_at=Max("updated_at")),
+    ),
+    "comments of review": (
+        "reviews_comment",
+        lambda ids: Comment.objects.filter(review=ids["review"])[:10],
+    ),
+    "titles by year": (
+        "reviews_title",
+        lambda ids: Title.objects.filter(year=ids["year"])[:10],
+    ),
+    "titles by category": (
+        "reviews_title",
+        lambda ids: Title.objects.filter(category=ids["category"])[:10],
+    ),
+    "titles by genre": (
+        "reviews_genretitle",
+        lambda ids: Title.objects.filter(genre=ids["genre"])[:10],
+    ),
+    "genres of titles": (
+        "reviews_genretitle",
+        lambda ids: Genre.objects.filter(titles__in=ids["titles"]),
+    ),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def full_scans(plan, vendor):
+    """Таблицы, которые план читает целиком, без индекса."""
+    if vendor == "postgresql":
+        return set(re.findall(r"Seq Scan on (\w+)", plan))
+    tables = set()
+    for line in plan.splitlines():
+        match = re.search(r"\bSCAN (?:TABLE )?(\w+)(.*)", line)
+        if match and "INDEX" not in match.group(2):
+            tables.add(match.group(1))
+    return tables
+
+
+class Command(BaseCommand):
+    """
+    Планы горячих запросов API на сгенерированных данных:
+    для каждого запроса выводится, читается ли его таблица
+    по индексу, и лучшее время выполнения.
+    Данные создаются в транзакции и откатываются.
+    С --verbosity 2 печатаются планы целиком.
+    """
+
+    help = "EXPLAIN hot API queries on a generated dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--titles",
+            type=int,
+            default=5000,
+            help="Titles to generate (default: 5000)",
+        )
+        parser.add_argument(
+            "--reviews",
+            type=int,
+            default=10,
+            help="Reviews per title (default: 10)",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=2,
+            help="Comments per review (default: 2)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Runs per query, the best one is reported (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        for option in ("titles", "reviews", "comments", "repeat"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} должен быть больше нуля")
+        self.verbosity = options["verbosity"]
+        failed = []
+        try:
+            with transaction.atomic():
+                ids = self.generate(
+                    options["titles"], options["reviews"], options["comments"]
+                )
+                for name, (table, query) in HOT_QUERIES.items():
+                    if not self.explain(
+                        name, table, query(ids), options["repeat"]
+                    ):
+                        failed.append(name)
+                raise Rollback
+        except Rollback:
+            pass
+        if failed:
+            raise CommandError(f"Полный просмотр таблицы: {', '.join(failed)}")
+
+    def generate(self, titles, reviews, comments):
+        started = time.monotonic()
+        # SQLite не возвращает id из bulk_create, строки читаются заново.
+        User.objects.bulk_create(
+            User(username=f"explain_{number}", email=f"{number}@e.fake")
+            for number in range(reviews)
+        )
+        users = list(User.objects.filter(username__startswith="explain_"))
+        Category.objects.bulk_create(
+            Category(name=f"Категория {number}", slug=f"explain-c{number}")
+            for number in range(20)
+        )
+        categories = list(Category.objects.filter(slug__startswith="explain-"))
+        Genre.objects.bulk_create(
+            Genre(name=f"Жанр {number}", slug=f"explain-g{number}")
+            for number in range(20)
+        )
+        genres = list(Genre.objects.filter(slug__startswith="explain-"))
+        Title.objects.bulk_create(
+            Title(
+                name=f"Произведение {number}",
+                year=1900 + number % 120,
+                category=categories[number % len(categories)],
+            )
+            for number in range(titles)
+        )
+        title_ids = list(
+            Title.objects.filter(name__startswith="Произведение ")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title_id, genre=genre)
+            for number, title_id in enumerate(title_ids)
+            for genre in (
+                genres[number % len(genres)],
+                genres[(number + 1) % len(genres)],
+            )
+        )
+        Review.objects.bulk_create(
+            (
+                Review(title_id=title_id, author=user, text="-", score=5)
+                for title_id in title_ids
+                for user in users
+            ),
+            batch_size=5000,
+        )
+        review_ids = list(
+            Review.objects.filter(title__in=title_ids).values_list(
+                "pk", flat=True
+            )
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(review_id=review_id, author=users[0], text="-")
+                for review_id in review_ids
+                for _ in range(comments)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Сгенерировано: {len(title_ids)} произведений, "
+            f"{len(review_ids)} отзывов за {time.monotonic() - started:.1f} с"
+        )
+        middle = title_ids[len(title_ids) // 2]
+        return {
+            "title": middle,
+            "titles": title_ids[:10],
+            "review": review_ids[len(review_ids) // 2],
+            "year": 1950,
+            "category": categories[0].pk,
+            "genre": genres[0].pk,
+        }
+
+    def explain(self, name, table, queryset, repeat):
+        plan = queryset.explain()
+        indexed = table not in full_scans(plan, connection.vendor)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            best = min(best, time.perf_counter() - started)
+        status = "индекс" if indexed else "полный просмотр"
+        line = f"{name:<20} {table:<20} {status:<16} {best * 1e3:>8.2f} мс"
+        self.stdout.write(
+            self.style.SUCCESS(line) if indexed else self.style.ERROR(line)
+        )
+        if self.verbosity > 1:
+            self.stdout.write(plan)
+        return indexed
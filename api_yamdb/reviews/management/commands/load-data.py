@@ -1,111 +1,385 @@
 import csv
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 
 from django.conf import settings
-from django.core.management import BaseCommand
-
-from reviews.models import (
-    Category,
-    Comment,
-    Genre,
-    GenreTitle,
-    Review,
-    Title,
-    User,
-)
-
-MODEL_AND_FILE_TABLE = {
-    User: "users.csv",
-    Category: "category.csv",
-    Genre: "genre.csv",
-    Title: "titles.csv",
-    GenreTitle: "genre_title.csv",
-    Review: "review.csv",
-    Comment: "comments.csv",
-}
-
-
-def check_exists_models(table):
-    for model, file in table.items():
-        if model.objects.exists():
-            print("Такие данные уже существуют")
-            continue
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from api.cache import CACHED_RESOURCES, bump_generations
+from reviews.dataset import MODEL_AND_FILE_TABLE
+from reviews.models import Title
+
+LOAD_MODES = ("skip", "upsert", "truncate")
+
+COPY_NULL = r"\N"
+
+
+def dependency_levels(models):
+    """
+    Разбивает модели на уровни: модели одного уровня ссылаются
+    только на модели предыдущих уровней и загружаются параллельно.
+    """
+    pending = list(models)
+    loaded = set()
+    levels = []
+    while pending:
+        level = [
+            model
+            for model in pending
+            if all(
+                field.related_model in loaded
+                or field.related_model not in pending
+                or field.related_model is model
+                for field in model._meta.concrete_fields
+                if field.is_relation
+            )
+        ]
+        if not level:
+            raise CommandError("Циклическая зависимость между таблицами")
+        levels.append(level)
+        loaded.update(level)
+        pending = [model for model in pending if model not in loaded]
+    return levels
+
+
+def get_csv_fields(model, columns):
+    """
+    Поля модели для колонок csv-файла.
+    Колонки связей называются и по полю (author), и по столбцу (title_id).
+    """
+    try:
+        return [model._meta.get_field(column) for column in columns]
+    except FieldDoesNotExist as error:
+        raise CommandError(f"{model.__name__}: {error}")
+
+
+def build_object(model, fields, row):
+    values = {}
+    for field, value in zip(fields, row):
+        if value == "" and field.null:
+            value = None
+        values[field.attname] = field.to_python(value)
+    return model(**values)
+
+
+def read_batches(file_location, model, batch_size):
+    """
+    Построчно читает csv-файл: первым отдаёт поля модели для колонок
+    заголовка, затем объекты пачками. В памяти не больше одной пачки.
+    """
+    try:
+        csv_file = open(file_location, "r", encoding="utf-8")
+    except OSError as error:
+        raise CommandError(f"{model.__name__}: {error}")
+    with csv_file:
+        reader = csv.reader(csv_file, delimiter=",")
+        fields = get_csv_fields(model, next(reader))
+        yield fields
+        while True:
+            batch = [
+                build_object(model, fields, row)
+                for row in islice(reader, batch_size)
+            ]
+            if not batch:
+                return
+            yield batch
+
+
+@contextmanager
+def keep_auto_dates(models):
+    """
+    Даты с auto_now_add (pub_date) берутся из файла,
+    а не заменяются текущим временем при вставке.
+    Флаги полей общие для всего процесса, поэтому исходные
+    значения возвращаются и при ошибке загрузки. Отдаёт поля
+    со снятым флагом.
+    """
+    saved = [
+        (field, field.auto_now_add)
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield {field for field, _ in saved}
+    finally:
+        for field, auto_now_add in saved:
+            field.auto_now_add = auto_now_add
+
+
+def upsert(queryset, fields, batch):
+    """Обновляет строки с существующими id, остальные вставляет."""
+    model = queryset.model
+    existing = set(
+        queryset.filter(pk__in=[obj.pk for obj in batch]).values_list(
+            "pk", flat=True
+        )
+    )
+    update_fields = [
+        field.name for field in fields if not field.primary_key
+    ] + [
+        field.name
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+    ]
+    now = timezone.now()
+    to_update = []
+    for obj in batch:
+        if obj.pk in existing:
+            for field in model._meta.concrete_fields:
+                if getattr(field, "auto_now", False):
+                    setattr(obj, field.attname, now)
+            to_update.append(obj)
+    queryset.bulk_update(to_update, update_fields)
+    queryset.bulk_create([obj for obj in batch if obj.pk not in existing])
+
+
+def copy_batch(connection, model, batch):
+    """
+    Загружает пачку через COPY FROM STDIN. Передаются все колонки модели:
+    значения по умолчанию и auto_now проставляются так же, как в save().
+    """
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for obj in batch:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(
+                field.pre_save(obj, add=True), connection
+            )
+            row.append(COPY_NULL if value is None else value)
+        writer.writerow(row)
+    buffer.seek(0)
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    sql = (
+        f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+        f"({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+@contextmanager
+def deferred_indexes(connection, model):
+    """
+    На время COPY удаляет неуникальные индексы таблицы
+    и строит их заново одним проходом после загрузки.
+    Внешние ключи Django создаёт DEFERRABLE INITIALLY DEFERRED,
+    они проверяются при фиксации транзакции.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) "
+            "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass "
+            "AND NOT i.indisunique AND NOT i.indisprimary",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+    yield
+    with connection.cursor() as cursor:
+        for _, definition in indexes:
+            cursor.execute(definition)
 
 
 class Command(BaseCommand):
     """
     Команда для переноса данных из csv-файлов в БД Django.
 
-    При старте осуществляет дополнительно простую проверку,
-    существуют ли такие модели данных в БД.
+    Файлы читаются потоково и вставляются пачками: в PostgreSQL через
+    COPY FROM STDIN с отложенным построением индексов, в остальных
+    базах через bulk_create. Каждая таблица загружается в своей
+    транзакции, независимые таблицы PostgreSQL - параллельно
+    (кроме вызова внутри открытой транзакции).
+    Режимы для таблиц, в которых уже есть данные:
+        skip - таблица пропускается;
+        upsert - строки с существующими id обновляются;
+        truncate - перед загрузкой все таблицы очищаются.
+    Сигналы при пакетной вставке не срабатывают, поэтому в конце
+    пересчитывается рейтинг произведений и сбрасывается кеш ответов.
     """
 
     help = "Import csv to models in Django db"
 
-    def handle(self, *args, **kwargs):
-        check_exists_models(MODEL_AND_FILE_TABLE)
-
-        for model, file in MODEL_AND_FILE_TABLE.items():
-            file_location = f"{settings.BASE_DIR}/static/data/{file}"
-
-            with open(file_location, "r", encoding="utf-8") as csv_file:
-                reader = csv.DictReader(csv_file, delimiter=",")
-                for row in reader:
-                    if model == User:
-                        data = model(
-                            id=row["id"],
-                            username=row["username"],
-                            email=row["email"],
-                            role=row["role"],
-                            bio=row["bio"],
-                            first_name=row["first_name"],
-                            last_name=row["last_name"],
-                        )
-                        data.save()
-                    if model == Category:
-                        data = model(
-                            id=row["id"],
-                            name=row["name"],
-                            slug=row["slug"],
-                        )
-                        data.save()
-                    if model == Genre:
-                        data = model(
-                            id=row["id"],
-                            name=row["name"],
-                            slug=row["slug"],
-                        )
-                        data.save()
-                    if model == Title:
-                        data = model(
-                            id=row["id"],
-                            name=row["name"],
-                            year=row["year"],
-                            category_id=row["category"],
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per INSERT batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=LOAD_MODES,
+            default="skip",
+            help="What to do with tables that already have rows",
+        )
+        parser.add_argument(
+            "--data-dir",
+            default=f"{settings.BASE_DIR}/static/data",
+            help="Directory with csv files",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Tables loaded in parallel on PostgreSQL (default: 4)",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to load into",
+        )
+
+    def handle(self, *args, **options):
+        self.using = options["database"]
+        self.verbosity = options["verbosity"]
+        self.batch_size = options["batch_size"]
+        if self.batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+        if options["workers"] < 1:
+            raise CommandError("--workers должен быть больше нуля")
+        mode = options["mode"]
+        connection = connections[self.using]
+        self.use_copy = connection.vendor == "postgresql" and mode != "upsert"
+        # SQLite блокирует базу на запись целиком. Внутри транзакции
+        # вызывающего соединения потоки не видят его незафиксированных
+        # строк и ждут его блокировок, поэтому загрузка идёт в нём.
+        workers = options["workers"]
+        if connection.vendor == "sqlite" or connection.in_atomic_block:
+            workers = 1
+        if mode == "truncate":
+            self.truncate(MODEL_AND_FILE_TABLE)
+
+        summary = []
+        executor = (
+            ThreadPoolExecutor(max_workers=workers)
+            if workers > 1
+            else nullcontext()
+        )
+        # Потоки завершаются при выходе из executor, до возврата флагов.
+        with keep_auto_dates(MODEL_AND_FILE_TABLE) as auto_dates, executor:
+            self.auto_dates = auto_dates
+            for level in dependency_levels(MODEL_AND_FILE_TABLE):
+                tasks = []
+                for model in level:
+                    queryset = model.objects.using(self.using)
+                    if mode == "skip" and queryset.exists():
+                        self.stdout.write(
+                            f"{model.__name__}: "
+                            "такие данные уже существуют, пропуск"
                         )
-                        data.save()
-                    if model == GenreTitle:
-                        data = model(
-                            id=row["id"],
-                            title_id=row["title_id"],
-                            genre_id=row["genre_id"],
+                        continue
+                    file = MODEL_AND_FILE_TABLE[model]
+                    tasks.append(
+                        (
+                            model,
+                            f"{options['data_dir']}/{file}",
+                            mode == "upsert",
                         )
-                        data.save()
-                    if model == Review:
-                        data = model(
-                            id=row["id"],
-                            title_id=row["title_id"],
-                            text=row["text"],
-                            author_id=row["author"],
-                            score=row["score"],
-                            pub_date=row["pub_date"],
+                    )
+                if workers > 1:
+                    summary.extend(
+                        executor.map(
+                            lambda task: self.load_in_thread(*task), tasks
                         )
-                        data.save()
-                    if model == Comment:
-                        data = model(
-                            id=row["id"],
-                            review_id=row["review_id"],
-                            text=row["text"],
-                            author_id=row["author"],
-                            pub_date=row["pub_date"],
+                    )
+                else:
+                    summary.extend(self.load(*task) for task in tasks)
+
+        Title.objects.using(self.using).recalculate_rating()
+        # Только ответы API: остальные ключи общего кеша не трогаются.
+        for resource in CACHED_RESOURCES:
+            bump_generations(resource, "all")
+        self.write_summary(summary)
+
+    def write_summary(self, summary):
+        method = "COPY" if self.use_copy else "ORM"
+        for model, rows, elapsed in summary:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model.__name__:<12} {method:<4} {rows:>10} строк "
+                    f"{elapsed:>8.1f} с "
+                    f"{rows / max(elapsed, 1e-6):>10.0f} строк/с"
+                )
+            )
+
+    def truncate(self, table):
+        connection = connections[self.using]
+        sql_list = connection.ops.sql_flush(
+            no_style(),
+            [model._meta.db_table for model in table],
+            reset_sequences=True,
+            allow_cascade=True,
+        )
+        connection.ops.execute_sql_flush(sql_list)
+
+    def load_in_thread(self, *args):
+        """У каждого потока своё соединение, его нужно закрыть."""
+        try:
+            return self.load(*args)
+        finally:
+            connections[self.using].close()
+
+    def load(self, model, file_location, update_existing):
+        started = time.monotonic()
+        rows = 0
+        connection = connections[self.using]
+        queryset = model.objects.using(self.using)
+        batches = read_batches(file_location, model, self.batch_size)
+        fields = next(batches)
+        # Даты, которых нет в файле, ставятся как при обычной вставке.
+        missing_dates = [
+            field
+            for field in model._meta.concrete_fields
+            if field in self.auto_dates and field not in fields
+        ]
+        indexes = (
+            deferred_indexes(connection, model)
+            if self.use_copy
+            else nullcontext()
+        )
+        with transaction.atomic(using=self.using):
+            with indexes:
+                for batch in batches:
+                    now = timezone.now()
+                    for obj in batch:
+                        for field in missing_dates:
+                            setattr(obj, field.attname, now)
+                    if self.use_copy:
+                        copy_batch(connection, model, batch)
+                    elif update_existing:
+                        upsert(queryset, fields, batch)
+                    else:
+                        queryset.bulk_create(batch)
+                    rows += len(batch)
+                    if self.verbosity >= 2:
+                        elapsed = time.monotonic() - started
+                        self.stdout.write(
+                            f"{model.__name__}: {rows} строк, "
+                            f"{rows / max(elapsed, 1e-6):.0f} строк/с"
                         )
-                        data.save()
+            self.reset_sequence(model)
+        return model, rows, time.monotonic() - started
+
+    def reset_sequence(self, model):
+        """Id заданы явно, поэтому последовательность PostgreSQL сдвигается."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,46 @@
+from django.core.management import BaseCommand, CommandError
+from django.db.models import F
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """
+    Команда для пересчёта рейтинга произведений с нуля.
+
+    Сумма и количество оценок поддерживаются сигналами инкрементально,
+    команда нужна после массовой загрузки данных (load-data, loaddata)
+    и для проверки, что сохранённые агрегаты не разошлись с отзывами.
+    """
+
+    help = "Rebuild title rating aggregates from reviews"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report titles with stale aggregates, do not fix them",
+        )
+
+    def handle(self, *args, **options):
+        stale = (
+            Title.objects.with_actual_rating()
+            .exclude(
+                score_sum=F("actual_score_sum"),
+                score_count=F("actual_score_count"),
+            )
+            .count()
+        )
+        if options["check"]:
+            if stale:
+                raise CommandError(
+                    f"Рейтинг расходится с отзывами у {stale} произведений"
+                )
+            self.stdout.write("Рейтинг всех произведений актуален")
+            return
+
+        updated = Title.objects.recalculate_rating()
+        self.stdout.write(
+            f"Пересчитан рейтинг {updated} произведений, "
+            f"исправлено расхождений: {stale}"
+        )
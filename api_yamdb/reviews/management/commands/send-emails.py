@@ -0,0 +1,46 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.outbox import send_pending
+
+
+class Command(BaseCommand):
+    """
+    Воркер очереди писем: пачками отправляет письма из OutboxEmail.
+    Неудачные попытки повторяются с экспоненциальной паузой
+    до EMAIL_OUTBOX_MAX_ATTEMPTS раз.
+    """
+
+    help = "Send queued emails from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Emails per batch (default: EMAIL_OUTBOX_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty (default: 5)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox once and exit",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size is not None and batch_size < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+        while True:
+            sent, failed = send_pending(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Отправлено: {sent}, ошибок: {failed}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,65 @@
+# Generated by Django 3.2 on 2026-10-17 12:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    db_alias = schema_editor.connection.alias
+
+    def review_aggregate(aggregate):
+        reviews = (
+            Review.objects.using(db_alias)
+            .filter(title=models.OuterRef("pk"))
+            .order_by()
+            .values("title")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+        return Coalesce(models.Subquery(reviews), 0)
+
+    titles = Title.objects.using(db_alias)
+    titles.update(
+        score_sum=review_aggregate(models.Sum("score")),
+        score_count=review_aggregate(models.Count("pk")),
+    )
+    titles.exclude(score_count=0).update(
+        rating=models.ExpressionWrapper(
+            (2 * models.F("score_sum") + models.F("score_count"))
+            / (2 * models.F("score_count")),
+            output_field=models.IntegerField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0002_auto_20230324_1601"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="score_sum",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Сумма оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating",
+            field=models.PositiveSmallIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Рейтинг"
+            ),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
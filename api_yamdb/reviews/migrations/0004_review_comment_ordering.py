@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-17 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0003_title_rating"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="comment",
+            options={
+                "ordering": ["-pub_date", "-id"],
+                "verbose_name": "Комментарий",
+                "verbose_name_plural": "Комментарии",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="review",
+            options={
+                "ordering": ["-pub_date", "-id"],
+                "verbose_name": "Отзыв",
+                "verbose_name_plural": "Отзывы",
+            },
+        ),
+    ]
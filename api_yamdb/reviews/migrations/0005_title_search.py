@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-17 12:00
+
+from django.db import migrations
+
+POSTGRESQL_FORWARD_SQL = [
+    """
+    ALTER TABLE reviews_title ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX reviews_title_search_vector_idx
+    ON reviews_title USING gin (search_vector)
+    """,
+]
+
+POSTGRESQL_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS reviews_title_search_vector_idx",
+    "ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_postgresql(statements):
+    """
+    Колонка и индекс есть только в PostgreSQL,
+    FTS5-индекс для SQLite создаёт обработчик post_migrate.
+    """
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0004_review_comment_ordering"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgresql(POSTGRESQL_FORWARD_SQL),
+            run_postgresql(POSTGRESQL_REVERSE_SQL),
+        ),
+    ]
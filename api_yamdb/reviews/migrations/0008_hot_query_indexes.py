@@ -0,0 +1,68 @@
+# Generated by Django 3.2 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+def delete_duplicate_genres(apps, schema_editor):
+    """Перед уникальным ограничением остаётся первая связь каждой пары."""
+    GenreTitle = apps.get_model("reviews", "GenreTitle")
+    links = GenreTitle.objects.using(schema_editor.connection.alias)
+    first_ids = (
+        links.order_by()
+        .values("title", "genre")
+        .annotate(first_id=models.Min("id"))
+        .values("first_id")
+    )
+    links.exclude(id__in=first_ids).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0007_outboxemail"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_genres, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="genretitle",
+            constraint=models.UniqueConstraint(
+                fields=("title", "genre"), name="unique_title_genre"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="genretitle",
+            index=models.Index(
+                fields=["genre", "title"], name="genretitle_genre_title_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["category", "name"], name="title_category_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["year", "name"], name="title_year_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["title", "-pub_date", "-id"],
+                include=("updated_at",),
+                name="review_title_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["review", "-pub_date", "-id"],
+                include=("updated_at",),
+                name="comment_review_pub_date_idx",
+            ),
+        ),
+    ]
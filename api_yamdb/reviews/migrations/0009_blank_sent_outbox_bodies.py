@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-17 12:00
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Q
+
+
+def blank_sent_bodies(apps, schema_editor):
+    """Коды подтверждения из уже отправленных и брошенных писем."""
+    OutboxEmail = apps.get_model("reviews", "OutboxEmail")
+    OutboxEmail.objects.using(schema_editor.connection.alias).filter(
+        Q(sent_at__isnull=False)
+        | Q(attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+    ).update(body="")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0008_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_sent_bodies, migrations.RunPython.noop),
+    ]
@@ -7,8 +7,10 @@ from django.core.validators import (
     MinValueValidator,
     validate_slug,
 )
-from django.db import models
-from model_utils import Choices
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+from model_utils import Choices, FieldTracker
 
 USER_ROLE_CHOISES = Choices(
     ("user", "Авторизованный пользователь"),
@@ -30,6 +32,8 @@ class User(AbstractUser):
         choices=USER_ROLE_CHOISES,
     )
 
+    tracker = FieldTracker(fields=["username"])
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -106,10 +110,82 @@ class Genre(models.Model):
         return self.name
 
 
+def rating_expression(score_sum, score_count):
+    """
+    Округлённое до целого среднее арифметическое оценок.
+    Целочисленное деление даёт округление половины вверх,
+    как у Round(Avg(...)).
+    """
+    return models.ExpressionWrapper(
+        (2 * score_sum + score_count) / (2 * score_count),
+        output_field=models.IntegerField(),
+    )
+
+
+def review_aggregate(aggregate):
+    """Подзапрос с агрегатом по отзывам произведения из внешнего запроса."""
+    reviews = (
+        Review.objects.filter(title=models.OuterRef("pk"))
+        .order_by()
+        .values("title")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Coalesce(models.Subquery(reviews), 0)
+
+
+class TitleQuerySet(models.QuerySet):
+    def update_rating(self, score_delta, count_delta):
+        """
+        Атомарно сдвигает сумму и количество оценок произведений
+        и пересчитывает рейтинг одним UPDATE без чтения строки.
+        """
+        score_sum = models.F("score_sum") + score_delta
+        score_count = models.F("score_count") + count_delta
+        return self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            updated_at=Now(),
+            rating=models.Case(
+                models.When(score_count=-count_delta, then=None),
+                default=rating_expression(score_sum, score_count),
+            ),
+        )
+
+    def with_actual_rating(self):
+        """Аннотирует сумму и количество оценок, посчитанные по отзывам."""
+        return self.annotate(
+            actual_score_sum=review_aggregate(models.Sum("score")),
+            actual_score_count=review_aggregate(models.Count("pk")),
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает агрегаты оценок с нуля по таблице отзывов."""
+        with transaction.atomic(using=self.db):
+            updated = self.update(
+                score_sum=review_aggregate(models.Sum("score")),
+                score_count=review_aggregate(models.Count("pk")),
+                updated_at=Now(),
+            )
+            self.update(
+                rating=models.Case(
+                    models.When(score_count=0, then=None),
+                    default=rating_expression(
+                        models.F("score_sum"), models.F("score_count")
+                    ),
+                )
+            )
+        return updated
+
+
 class Title(models.Model):
     """
     Произведения, к которым пишут отзывы
     (определённый фильм, книга или песенка).
+    Сумма и количество оценок поддерживаются сигналами модели Review,
+    рейтинг хранится уже посчитанным.
+    updated_at меняется при любом изменении представления произведения,
+    в том числе рейтинга, категории и жанров.
     """
 
     name = models.CharField(
@@ -139,11 +215,30 @@ class Title(models.Model):
         "Описание",
         blank=True,
     )
+    score_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    score_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        "Рейтинг", null=True, blank=True, editable=False
+    )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        # Фильтры списка с сортировкой по умолчанию.
+        indexes = [
+            models.Index(
+                fields=["category", "name"], name="title_category_name_idx"
+            ),
+            models.Index(fields=["year", "name"], name="title_year_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -153,6 +248,20 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
 
+    class Meta:
+        # Пара индексов покрывает связь в обе стороны:
+        # жанры произведений и произведения жанра.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "genre"], name="unique_title_genre"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["genre", "title"], name="genretitle_genre_title_idx"
+            ),
+        ]
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -175,10 +284,25 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации отзыва", auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения отзыва", auto_now=True
+    )
+
+    tracker = FieldTracker(fields=["score", "title"])
 
     class Meta:
+        ordering = ["-pub_date", "-id"]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
+        # Список отзывов произведения в порядке Meta.ordering, updated_at
+        # в индексе нужен версии списка (ETag) без чтения таблицы.
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                include=["updated_at"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["author", "title"], name="unique_author_title_pair"
@@ -190,6 +314,14 @@ class Review(models.Model):
             f"Отзыв {self.author.username} на произведение {self.title.name}"
         )
 
+    def save(self, *args, **kwargs):
+        """
+        Сохранение отзыва и обновление рейтинга (сигнал post_save)
+        выполняются в одной транзакции.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -202,13 +334,59 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации комментария", auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения комментария", auto_now=True
+    )
 
     class Meta:
+        ordering = ["-pub_date", "-id"]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                include=["updated_at"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
             f"Комментарий {self.author.username} на "
             f"отзыв {self.review.author.username}"
         )
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку (transactional outbox).
+    Создаётся в одной транзакции с изменениями, которые его вызвали,
+    и отправляется командой send-emails.
+    """
+
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    from_email = models.CharField("Отправитель", max_length=254)
+    to = models.EmailField("Получатель", max_length=254)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField("Попыток отправки", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    sent_at = models.DateTimeField("Дата отправки", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="outbox_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to}"
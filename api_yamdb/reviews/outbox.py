@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """
+    Аналог send_mail: письма сохраняются в очередь и уходят позже.
+    Вызывается внутри транзакции, которая породила письмо,
+    поэтому при её откате письмо тоже не отправится.
+    """
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(
+            subject=subject, body=message, from_email=from_email, to=to
+        )
+        for to in recipient_list
+    )
+
+
+def get_backoff(attempts):
+    """Экспоненциальная пауза перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1)
+    )
+
+
+def claim_pending(batch_size):
+    """
+    Забирает пачку писем, срок которых наступил, в короткой транзакции:
+    строки блокируются с SKIP LOCKED, попытка засчитывается, а следующая
+    откладывается на EMAIL_OUTBOX_CLAIM_TIMEOUT секунд. Пока письма
+    отправляются, другие воркеры их не берут, а после падения воркера
+    они вернутся в очередь по истечении этого срока.
+    """
+    claimed_until = timezone.now() + timedelta(
+        seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+    )
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=timezone.now(),
+                attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            )[:batch_size]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = claimed_until
+        OutboxEmail.objects.bulk_update(
+            emails, ["attempts", "next_attempt_at"]
+        )
+    return emails
+
+
+def send_pending(batch_size=None):
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером.
+    Письма забираются claim_pending, отправка идёт вне транзакции,
+    поэтому воркеров может быть несколько и блокировки не держатся
+    на время обмена с сервером. Текст отправленного или брошенного
+    письма (в нём код подтверждения) стирается.
+    Возвращает количество отправленных и неудачных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = failed = 0
+    emails = claim_pending(batch_size)
+    if not emails:
+        return sent, failed
+    connection = get_connection()
+    try:
+        for email in emails:
+            try:
+                # Открытое заранее соединение send() не закрывает.
+                connection.open()
+                EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    [email.to],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                # Соединение могло оборваться, следующее письмо
+                # откроет новое.
+                connection.close()
+                email.last_error = f"{type(error).__name__}: {error}"
+                email.next_attempt_at = timezone.now() + get_backoff(
+                    email.attempts
+                )
+                if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    email.body = ""
+                failed += 1
+            else:
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                email.body = ""
+                sent += 1
+    finally:
+        connection.close()
+        OutboxEmail.objects.bulk_update(
+            emails, ["sent_at", "next_attempt_at", "last_error", "body"]
+        )
+    return sent, failed
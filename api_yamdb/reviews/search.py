@@ -0,0 +1,131 @@
+"""
+Полнотекстовый поиск по названию и описанию произведений.
+
+В PostgreSQL используется хранимая генерируемая колонка search_vector
+с GIN-индексом (миграция 0005_title_search), её значение СУБД
+пересчитывает сама при каждом изменении строки.
+Для локального запуска на SQLite индекс строится на FTS5-таблице,
+которую синхронизируют триггеры на reviews_title.
+"""
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "russian"
+
+SQLITE_FTS_TABLE = "reviews_title_fts"
+
+SQLITE_SEARCH_INDEX_SQL = {
+    SQLITE_FTS_TABLE: (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts "
+        "USING fts5(name, description, content='reviews_title', "
+        "content_rowid='id', tokenize='unicode61')"
+    ),
+    "reviews_title_fts_insert": (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert "
+        "AFTER INSERT ON reviews_title BEGIN "
+        "INSERT INTO reviews_title_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); "
+        "END"
+    ),
+    "reviews_title_fts_delete": (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete "
+        "AFTER DELETE ON reviews_title BEGIN "
+        "INSERT INTO reviews_title_fts"
+        "(reviews_title_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "END"
+    ),
+    "reviews_title_fts_update": (
+        "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update "
+        "AFTER UPDATE OF name, description ON reviews_title BEGIN "
+        "INSERT INTO reviews_title_fts"
+        "(reviews_title_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO reviews_title_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); "
+        "END"
+    ),
+}
+
+
+def ensure_sqlite_search_index(connection):
+    """
+    Создаёт FTS5-индекс и триггеры, если их нет, и перестраивает индекс.
+    SQLite пересоздаёт таблицу при изменении схемы в миграциях,
+    вместе с ней пропадают и триггеры, поэтому проверка выполняется
+    после каждого migrate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s)"
+            % ", ".join("%s" for _ in SQLITE_SEARCH_INDEX_SQL),
+            list(SQLITE_SEARCH_INDEX_SQL),
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if existing == set(SQLITE_SEARCH_INDEX_SQL):
+            return
+        for statement in SQLITE_SEARCH_INDEX_SQL.values():
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) "
+            "VALUES ('rebuild')"
+        )
+
+
+def fts_match_expression(query):
+    """Экранирует слова запроса для MATCH: все слова должны найтись."""
+    return " ".join(
+        '"{}"'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает произведения по словам запроса и сортирует по релевантности.
+    Совпадение в названии весит больше, чем в описании.
+    """
+    if not query.split():
+        return queryset
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+        )
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        queryset = queryset.alias(
+            search_vector=RawSQL(
+                f'"{table}"."search_vector"',
+                [],
+                output_field=SearchVectorField(),
+            )
+        ).filter(search_vector=search_query)
+        search_rank = SearchRank(F("search_vector"), search_query)
+    elif vendor == "sqlite":
+        match = fts_match_expression(query)
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                [match],
+            )
+        )
+        search_rank = RawSQL(
+            f"SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) "
+            f"FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s "
+            f'AND rowid = "{table}"."id"',
+            [match],
+            output_field=FloatField(),
+        )
+    else:
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+    return queryset.annotate(search_rank=search_rank).order_by(
+        "-search_rank", "name"
+    )
@@ -0,0 +1,119 @@
+from django.db import connections
+from django.db.models.functions import Now
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .search import ensure_sqlite_search_index
+
+
+def create_search_index(sender, using, **kwargs):
+    """
+    Поддерживает FTS5-индекс произведений после migrate на SQLite.
+    Подключается в ReviewsConfig.ready для post_migrate приложения.
+    """
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        ensure_sqlite_search_index(connection)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    """
+    Учитывает оценку нового или изменённого отзыва в рейтинге произведения.
+    При загрузке фикстур (raw) рейтинг пересчитывается командой
+    recalculate-rating.
+    """
+    if raw:
+        return
+    if created:
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score, 1
+        )
+        return
+    previous_title_id = instance.tracker.previous("title")
+    if previous_title_id != instance.title_id:
+        Title.objects.filter(pk=previous_title_id).update_rating(
+            -instance.tracker.previous("score"), -1
+        )
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score, 1
+        )
+    elif instance.tracker.has_changed("score"):
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score - instance.tracker.previous("score"), 0
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """
+    Исключает оценку удалённого отзыва из рейтинга произведения.
+    Срабатывает и при каскадном удалении автора или произведения.
+    """
+    Title.objects.filter(pk=instance.title_id).update_rating(
+        -instance.score, -1
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, created=False, **kwargs):
+    """
+    Категория входит в представление произведения. При удалении
+    произведения отбираются до того, как их category станет NULL.
+    """
+    if not created:
+        Title.objects.filter(category=instance).update(updated_at=Now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, created=False, **kwargs):
+    """Жанры входят в представление произведения."""
+    if not created:
+        Title.objects.filter(genre=instance).update(updated_at=Now())
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def touch_genre_title(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).update(updated_at=Now())
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Изменение жанров через title.genre и genre.titles.
+    При genre.titles.clear() произведения отбираются до очистки.
+    """
+    if reverse and action == "pre_clear":
+        titles = Title.objects.filter(genre=instance)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        titles = Title.objects.filter(pk__in=pk_set or [instance.pk])
+    else:
+        return
+    titles.update(updated_at=Now())
+
+
+@receiver(post_delete, sender=Comment)
+def touch_comment_review(sender, instance, **kwargs):
+    """
+    Удаление комментария меняет список комментариев отзыва,
+    его дата изменения берётся из updated_at отзыва.
+    """
+    Review.objects.filter(pk=instance.review_id).update(updated_at=Now())
+
+
+@receiver(post_save, sender=User)
+def touch_author_posts(sender, instance, created, raw, **kwargs):
+    """Имя автора входит в представление отзывов и комментариев."""
+    if created or raw or not instance.tracker.has_changed("username"):
+        return
+    Review.objects.filter(author=instance).update(updated_at=Now())
+    Comment.objects.filter(author=instance).update(updated_at=Now())
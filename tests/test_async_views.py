@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory
+
+from api.async_views import read_async
+from api.views import TitleViewSet
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_async(title):
+    threads = []
+
+    def retrieve(request, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return view(request, *args, **kwargs)
+
+    view = TitleViewSet.as_view({'get': 'retrieve'})
+    expected = view(RequestFactory().get('/'), pk=title.pk).render()
+    response = async_to_sync(read_async(retrieve))(
+        AsyncRequestFactory().get('/'), pk=title.pk
+    )
+    assert response.status_code == 200
+    assert response.content == expected.content
+    assert threads[0].startswith('api-read'), (
+        'Проверьте, что чтение выполняется в пуле потоков'
+    )
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+
+from reviews.models import OutboxEmail
+
+
+def signup(client, username='new_user', email='new@yamdb.fake'):
+    response = client.post('/api/v1/auth/signup/', data={
+        'email': email, 'username': username
+    })
+    assert response.status_code == 200
+    body = OutboxEmail.objects.latest('id').body
+    return re.search(r'confirmation_code : (\S+)', body).group(1)
+
+
+def obtain_token(client, code, username='new_user'):
+    return client.post('/api/v1/auth/token/', data={
+        'username': username, 'confirmation_code': code
+    })
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def test_code_is_single_use(self, client):
+        code = signup(client)
+        response = obtain_token(client, code)
+        assert response.status_code == 200
+        assert response.json()['refresh']
+        assert response.json()['token']
+        assert obtain_token(client, code).status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+        assert obtain_token(client, signup(client)).status_code == 200
+
+    def test_code_expires(self, client, settings):
+        code = signup(client)
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        assert obtain_token(client, code).status_code == 400
+
+    def test_inactive_user_gets_no_token(self, client, django_user_model):
+        code = signup(client)
+        django_user_model.objects.filter(username='new_user').update(
+            is_active=False
+        )
+        assert obtain_token(client, code).status_code == 400, (
+            'Проверьте, что заблокированный пользователь не получает токен'
+        )
+
+    def test_signup_keeps_password(self, client, user):
+        user.set_password('real-password')
+        user.save()
+        code = signup(client, user.username, user.email)
+        user.refresh_from_db()
+        assert user.check_password('real-password'), (
+            'Проверьте, что регистрация не меняет пароль пользователя'
+        )
+        assert obtain_token(client, 'real-password', user.username)\
+            .status_code == 400
+        assert obtain_token(client, code, user.username).status_code == 200
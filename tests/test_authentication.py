@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.tokens import get_tokens_for_user
+from reviews.models import Review
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user).access_token}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_user_is_cached(self, client, user, django_assert_num_queries):
+        # Список категорий попадает в кеш ответов.
+        client.get('/api/v1/categories/')
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+
+    def test_role_change_invalidates_cache(
+        self, user, admin_api_client, django_capture_on_commit_callbacks
+    ):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_api_client.patch(
+                f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+            )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кеш пользователей'
+        )
+
+    def test_deactivation_invalidates_cache(
+        self, user, django_capture_on_commit_callbacks
+    ):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_rename_through_cached_user(
+        self, user, title, django_capture_on_commit_callbacks
+    ):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        yesterday = timezone.now() - timedelta(days=1)
+        Review.objects.filter(pk=review.pk).update(updated_at=yesterday)
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        etag = client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.patch(
+                '/api/v1/users/me/', data={'username': 'Renamed'}
+            )
+        assert response.status_code == 200
+        updated_at = Review.objects.get(pk=review.pk).updated_at
+        assert updated_at > yesterday, (
+            'Проверьте, что переименование через JWT обновляет отзывы автора'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['author'] == 'Renamed'
+        role = user.role
+        user.refresh_from_db()
+        assert (user.username, user.role) == ('Renamed', role)
+
+    def test_role_claims(
+        self, client, settings, user, title, django_assert_num_queries
+    ):
+        settings.JWT_TRUST_ROLE_CLAIMS = True
+        client.get('/api/v1/categories/')
+        client = jwt_client(user)
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        response = client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': '-', 'score': 7},
+        )
+        assert response.status_code == 201
+        assert Review.objects.get().author == user
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что остальные поля загружаются из БД'
+        )
+
+
+@pytest.mark.django_db
+class TestRefreshToken:
+
+    url = '/api/v1/auth/token/refresh/'
+
+    def test_refresh(self, client, user):
+        refresh = str(get_tokens_for_user(user))
+        response = client.post(self.url, data={'refresh': refresh})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['refresh'] != refresh, (
+            'Проверьте, что refresh-токен обновляется при каждом запросе'
+        )
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {data["token"]}')
+        assert api_client.get('/api/v1/users/me/').status_code == 200
+
+    def test_refresh_updates_claims(
+        self, client, user, django_capture_on_commit_callbacks
+    ):
+        refresh = str(get_tokens_for_user(user))
+        with django_capture_on_commit_callbacks(execute=True):
+            user.role = 'admin'
+            user.save()
+        response = client.post(self.url, data={'refresh': refresh})
+        assert response.status_code == 200
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        assert api_client.get('/api/v1/users/').status_code == 200
+
+    def test_inactive_user(self, client, user):
+        refresh = str(get_tokens_for_user(user))
+        user.is_active = False
+        user.save()
+        response = client.post(self.url, data={'refresh': refresh})
+        assert response.status_code == 401
+
+    def test_invalid_token(self, client):
+        response = client.post(self.url, data={'refresh': 'invalid'})
+        assert response.status_code == 401
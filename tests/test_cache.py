@@ -0,0 +1,82 @@
+import pytest
+
+from reviews.models import Genre, Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_titles_list_is_cached(
+        self, client, title, django_assert_num_queries
+    ):
+        url = '/api/v1/titles/?limit=5&offset=0'
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/?offset=0&limit=5')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров не влияет на ключ кеша'
+        )
+        assert response['ETag'] == client.get(url)['ETag']
+        assert response.json()['results'][0]['name'] == title.name
+        assert client.get('/api/v1/titles/?limit=1')['X-Cache'] == 'MISS'
+
+    def test_media_type_has_own_entry_and_etag(self, client, title):
+        url = '/api/v1/titles/'
+        json_response = client.get(url, HTTP_ACCEPT='application/json')
+        html_response = client.get(url, HTTP_ACCEPT='text/html')
+        assert html_response['Content-Type'].startswith('text/html')
+        assert html_response['X-Cache'] == 'MISS'
+        assert html_response['ETag'] != json_response['ETag'], (
+            'Проверьте, что ETag зависит от типа ответа'
+        )
+        response = client.get(
+            url,
+            HTTP_ACCEPT='text/html',
+            HTTP_IF_NONE_MATCH=json_response['ETag'],
+        )
+        assert response.status_code == 200
+        response = client.get(url, HTTP_ACCEPT='application/json')
+        assert response['X-Cache'] == 'HIT'
+        assert response['ETag'] == json_response['ETag']
+
+    def test_review_invalidates_title(
+        self, client, title, user, django_capture_on_commit_callbacks
+    ):
+        detail = f'/api/v1/titles/{title.pk}/'
+        client.get(detail)
+        client.get('/api/v1/titles/')
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(title=title, author=user, text='-', score=3)
+        response = client.get(detail)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 3
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+
+    def test_genre_invalidates_titles(
+        self, client, title, django_capture_on_commit_callbacks
+    ):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        client.get('/api/v1/genres/')
+        client.get(f'/api/v1/titles/{title.pk}/')
+        with django_capture_on_commit_callbacks(execute=True):
+            title.genre.add(genre)
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            genre.name = 'Трагедия'
+            genre.save()
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['genre'][0]['name'] == 'Трагедия'
+
+    def test_cache_stats(self, client, admin_api_client, category):
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        assert client.get('/api/v1/cache/stats/').status_code == 401
+        response = admin_api_client.get('/api/v1/cache/stats/')
+        assert response.json()['categories'] == {'hits': 1, 'misses': 1}
@@ -0,0 +1,71 @@
+import pytest
+
+from reviews.models import Comment, Review
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(title=title, author=user, text='-', score=5)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_title_detail_not_modified(
+        self, client, title, django_assert_num_queries
+    ):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response['ETag'].startswith('"')
+        assert 'Last-Modified' in response
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_reviews_list_not_modified(
+        self, client, title, review, another_user, django_assert_num_queries
+    ):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+        Review.objects.create(
+            title=title, author=another_user, text='-', score=1
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+        etag = response['ETag']
+        review.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_comments_list_changes_on_delete(self, client, review, user):
+        comment = Comment.objects.create(review=review, author=user, text='-')
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        comment.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_review_detail_changes_with_author_name(
+        self, client, review, user
+    ):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        etag = client.get(url)['ETag']
+        user.username = 'Renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['author'] == 'Renamed'
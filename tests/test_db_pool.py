@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from api_yamdb.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class Connection:
+
+    def __init__(self):
+        self.usable = True
+        self.closed = False
+
+
+def make_pool(**kwargs):
+    def is_usable(connection):
+        return connection.usable
+
+    def close(connection):
+        connection.closed = True
+
+    return ConnectionPool(is_usable, lambda connection: None, close, **kwargs)
+
+
+def test_connection_is_reused():
+    pool = make_pool()
+    connection = pool.acquire(Connection)
+    pool.release(connection)
+    assert pool.acquire(Connection) is connection
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['acquired'] == 2
+    assert stats['in_use'] == 1
+
+
+def test_broken_connection_is_replaced():
+    pool = make_pool(health_check_interval=0)
+    connection = pool.acquire(Connection)
+    pool.release(connection)
+    connection.usable = False
+    assert pool.acquire(Connection) is not connection
+    assert connection.closed
+    stats = pool.stats()
+    assert stats['health_check_failures'] == 1
+    assert stats['size'] == 1
+
+
+def test_waits_for_released_connection():
+    pool = make_pool(max_size=1, timeout=5)
+    connection = pool.acquire(Connection)
+    timer = threading.Timer(0.05, pool.release, [connection])
+    timer.start()
+    assert pool.acquire(Connection) is connection
+    timer.join()
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['wait_time'] > 0
+
+
+def test_timeout():
+    pool = make_pool(max_size=1, timeout=0.01)
+    pool.acquire(Connection)
+    with pytest.raises(PoolTimeout):
+        pool.acquire(Connection)
+    assert pool.stats()['timeouts'] == 1
@@ -0,0 +1,154 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api.tokens import get_tokens_for_user
+from api_yamdb.db_router import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    get_routing_stats,
+)
+from reviews.models import Category, Review
+
+
+def read_alias(request):
+    response = HttpResponse(ReplicaRouter().db_for_read(Review))
+    response.status_code = 201 if request.method == 'POST' else 200
+    return response
+
+
+def bearer(user):
+    return f'Bearer {get_tokens_for_user(user).access_token}'
+
+
+def stream_alias(request):
+    return StreamingHttpResponse(
+        ReplicaRouter().db_for_read(Review) for _ in range(2)
+    )
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        }
+    }
+
+
+@pytest.fixture
+def middleware(settings, shared_cache):
+    settings.DATABASE_REPLICAS = ['replica']
+    return ReplicaRoutingMiddleware(read_alias)
+
+
+@pytest.fixture
+def replica(settings, shared_cache, tmp_path):
+    """Реплика - отдельный файл SQLite с таблицей категорий."""
+    connections.settings['replica'] = {
+        **connections.settings['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+        'TEST': {},
+    }
+    with connections['replica'].schema_editor() as editor:
+        editor.create_model(Category)
+    settings.DATABASE_REPLICAS = ['replica']
+    yield Category.objects.using('replica')
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+def routed(middleware, method, path='/api/v1/titles/', **headers):
+    request = getattr(RequestFactory(), method)(path, **headers)
+    return middleware(request).content.decode()
+
+
+@pytest.mark.django_db
+def test_safe_api_requests_read_from_replica(middleware):
+    stats = get_routing_stats()
+    assert routed(middleware, 'get') == 'replica'
+    assert routed(middleware, 'post') == 'default'
+    assert routed(middleware, 'get', path='/admin/') == 'default'
+    assert ReplicaRouter().db_for_read(Review) == 'default', (
+        'Проверьте, что вне запроса чтения идут в default'
+    )
+    assert get_routing_stats()['replica_reads'] == stats['replica_reads'] + 1
+
+
+@pytest.mark.django_db
+def test_reads_stick_to_primary_after_write(middleware, user, another_user):
+    assert routed(
+        middleware, 'post', HTTP_AUTHORIZATION=bearer(user)
+    ) == 'default'
+    assert routed(
+        middleware, 'get', HTTP_AUTHORIZATION=bearer(user)
+    ) == 'default', (
+        'Проверьте, что после записи пользователь читает из default '
+        'и с новым токеном'
+    )
+    assert routed(
+        middleware, 'get', HTTP_AUTHORIZATION=bearer(another_user)
+    ) == 'replica'
+    assert routed(middleware, 'get') == 'replica'
+
+
+def test_streaming_body_reads_from_replica(settings, shared_cache):
+    settings.DATABASE_REPLICAS = ['replica']
+    middleware = ReplicaRoutingMiddleware(stream_alias)
+    response = middleware(RequestFactory().get('/api/v1/titles/?stream=1'))
+    assert b''.join(response.streaming_content) == b'replicareplica', (
+        'Проверьте, что части потокового ответа читаются из реплики'
+    )
+    assert ReplicaRouter().db_for_read(Review) == 'default'
+
+
+@pytest.mark.django_db
+def test_anonymous_writes_do_not_pin(middleware):
+    signup = '/api/v1/auth/signup/'
+    assert routed(middleware, 'post', path=signup) == 'default'
+    assert routed(middleware, 'get') == 'replica', (
+        'Проверьте, что запись без токена не переводит чтение '
+        'анонимов на default'
+    )
+
+
+def test_replicas_require_shared_cache(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    with pytest.raises(ImproperlyConfigured):
+        ReplicaRoutingMiddleware(read_alias)
+
+
+def test_no_replicas(settings):
+    settings.DATABASE_REPLICAS = []
+    middleware = ReplicaRoutingMiddleware(read_alias)
+    assert routed(middleware, 'get') == 'default'
+
+
+@pytest.mark.django_db
+def test_replica_database(client, settings, replica, user):
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    Category.objects.create(name='Основная', slug='primary')
+    replica.create(name='Реплика', slug='replica')
+
+    def names(**headers):
+        response = client.get('/api/v1/categories/', **headers)
+        return [item['name'] for item in response.json()['results']]
+
+    assert names() == ['Реплика'], (
+        'Проверьте, что GET-запросы к API читают из реплики'
+    )
+    response = client.patch(
+        '/api/v1/users/me/',
+        data={'bio': 'обновлено'},
+        content_type='application/json',
+        HTTP_AUTHORIZATION=bearer(user),
+    )
+    assert response.status_code == 200
+    assert names(HTTP_AUTHORIZATION=bearer(user)) == ['Основная'], (
+        'Проверьте, что после записи пользователь читает из default'
+    )
+    assert names() == ['Реплика']
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_dump_data_round_trip(self, tmp_path, title, user):
+        Review.objects.create(title=title, author=user, text='-', score=7)
+
+        call_command('dump-data', output_dir=str(tmp_path), chunk_size=1)
+
+        assert (tmp_path / 'titles.csv').read_text(encoding='utf-8') == (
+            'id,name,year,category,description\n'
+            f'{title.pk},{title.name},{title.year},{title.category_id},\n'
+        )
+        Review.objects.all().delete()
+        call_command('load-data', data_dir=str(tmp_path))
+        review = Review.objects.get()
+        assert review.author == user
+        assert Title.objects.get(pk=title.pk).rating == 7, (
+            'Проверьте, что выгрузка читается командой load-data'
+        )
+
+    def test_export_endpoint(self, client, admin_api_client, title):
+        url = '/api/v1/export/titles.ndjson'
+        assert client.get(url).status_code == 401, (
+            'Проверьте, что выгрузка доступна только админу'
+        )
+        response = admin_api_client.get(url)
+        assert response.status_code == 200
+        assert response.streaming
+        lines = b''.join(response.streaming_content).splitlines()
+        assert json.loads(lines[0])['name'] == title.name
+        assert admin_api_client.get(
+            '/api/v1/export/titles.xml'
+        ).status_code == 404
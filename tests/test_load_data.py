@@ -0,0 +1,133 @@
+from importlib import import_module
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, User,
+)
+
+CSV_FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,Крестный отец,1972,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Ставлю десять,100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Не понравилось,101,5,2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,101,2019-09-24T21:08:21.567Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in CSV_FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestLoadData:
+
+    def test_load_data(self, data_dir):
+        call_command('load-data', data_dir=str(data_dir), batch_size=1)
+
+        assert User.objects.count() == 2
+        assert Title.objects.get(pk=2).category is None
+        assert Title.objects.get(pk=1).rating == 8, (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        assert Comment.objects.get(pk=1).author.username == 'capt_obvious'
+
+    def test_load_data_modes(self, data_dir):
+        call_command('load-data', data_dir=str(data_dir))
+        Review.objects.filter(pk=2).update(text='Изменён')
+
+        call_command('load-data', data_dir=str(data_dir))
+        assert Review.objects.get(pk=2).text == 'Изменён'
+
+        (data_dir / 'review.csv').write_text(
+            CSV_FILES['review.csv'].replace('Не понравилось', 'Обновлён'),
+            encoding='utf-8',
+        )
+        call_command('load-data', data_dir=str(data_dir), mode='upsert')
+        assert Review.objects.get(pk=2).text == 'Обновлён'
+        assert Review.objects.count() == 2
+
+        call_command('load-data', data_dir=str(data_dir), mode='truncate')
+        assert Review.objects.count() == 2
+        assert User.objects.count() == 2
+
+    def test_load_data_keeps_other_cache_keys(self, data_dir):
+        cache.set('throttle:test', 1)
+        call_command('load-data', data_dir=str(data_dir))
+        assert cache.get('throttle:test') == 1, (
+            'Проверьте, что загрузка сбрасывает только кеш ответов'
+        )
+
+    def test_failed_load_restores_auto_dates(self, data_dir):
+        (data_dir / 'comments.csv').write_text(
+            'id,review_id,unknown\n1,1,x\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command('load-data', data_dir=str(data_dir))
+        assert Review._meta.get_field('pub_date').auto_now_add
+        assert Comment._meta.get_field('pub_date').auto_now_add, (
+            'Проверьте, что флаги auto_now_add возвращаются при ошибке'
+        )
+
+
+def test_dependency_levels():
+    command = import_module('reviews.management.commands.load-data')
+
+    levels = command.dependency_levels(command.MODEL_AND_FILE_TABLE)
+
+    assert levels == [
+        [User, Category, Genre],
+        [Title],
+        [GenreTitle, Review],
+        [Comment],
+    ], 'Проверьте, что таблицы загружаются после тех, на которые ссылаются'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_load_recreates_indexes(data_dir):
+    from django.db import connection
+
+    if connection.vendor != 'postgresql':
+        pytest.skip('COPY и отложенные индексы есть только в PostgreSQL')
+    call_command('load-data', data_dir=str(data_dir), workers=4)
+
+    assert Review.objects.count() == 2
+    assert GenreTitle.objects.count() == 2
+    assert Title.objects.get(pk=1).rating == 8
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexname FROM pg_indexes WHERE tablename = %s',
+            [Review._meta.db_table],
+        )
+        indexes = {name for name, in cursor.fetchall()}
+    assert 'review_title_pub_date_idx' in indexes, (
+        'Проверьте, что индексы пересоздаются после COPY'
+    )
+    # Последовательность id сдвинута за загруженные строки.
+    Review.objects.create(title_id=2, text='Новый', author_id=100, score=7)
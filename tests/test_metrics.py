@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return 0
+
+
+@pytest.mark.django_db
+def test_metrics_exposition(client):
+    route = 'yamdb_http_requests_total{route="api:category-list",method="GET"'
+    before = sample(client.get('/metrics').content.decode(), route)
+    client.get('/api/v1/categories/')
+    client.get('/api/v1/categories/')
+    client.get('/api/v1/missing/')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+    assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+    assert sample(text, route + ',status="200"}') == before + 2, (
+        'Проверьте, что запросы считаются по маршруту, методу и статусу'
+    )
+    assert sample(
+        text, 'yamdb_http_requests_total{route="unmatched",method="GET"'
+    ) >= 1
+    labels = '{route="api:category-list",method="GET"'
+    assert sample(
+        text, f'yamdb_db_queries_per_request_bucket{labels},le="+Inf"}}'
+    ) == sample(text, f'yamdb_db_queries_per_request_count{labels}}}')
+    assert (
+        'yamdb_response_cache_total{resource="categories",event="hits"}'
+        in text
+    )
+    assert 'yamdb_worker_info{pid=' in text
+
+
+@pytest.mark.django_db
+def test_metrics_aggregate_process_snapshots(client, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    dead = subprocess.Popen(['true'])
+    dead.wait()
+    labels = [['route', 'api:genre-list'], ['method', 'GET']]
+    (tmp_path / f'{dead.pid}.json').write_text(json.dumps({
+        'pid': dead.pid,
+        'worker': '7',
+        'counters': [
+            ['yamdb_http_requests_total', [*labels, ['status', '200']], 5],
+        ],
+        'histograms': [
+            ['yamdb_db_queries_per_request', labels, [0, 0, 5] + [0] * 7, 10],
+        ],
+    }))
+    client.get('/api/v1/genres/')
+    text = client.get('/metrics').content.decode()
+    route = 'yamdb_http_requests_total{route="api:genre-list",method="GET"'
+    assert sample(text, route + ',status="200"}') >= 6, (
+        'Проверьте, что счётчики процессов из METRICS_DIR складываются'
+    )
+    assert (
+        f'yamdb_worker_requests_total{{pid="{dead.pid}",worker="7"}} 5'
+        in text
+    )
+    assert not any(
+        line.startswith('yamdb_worker_info') and f'"{dead.pid}"' in line
+        for line in text.splitlines()
+    ), 'Проверьте, что yamdb_worker_info отдаётся только для живых воркеров'
+    assert (tmp_path / f'{os.getpid()}.json').exists()
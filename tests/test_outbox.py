@@ -0,0 +1,107 @@
+from smtplib import SMTPServerDisconnected
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise SMTPServerDisconnected('Connection unexpectedly closed')
+
+
+class ClaimCheckingBackend(BaseEmailBackend):
+    """Запоминает состояние письма в БД во время отправки."""
+
+    seen = []
+
+    def send_messages(self, email_messages):
+        self.seen.extend(OutboxEmail.objects.values_list(
+            'attempts', 'next_attempt_at'
+        ))
+        return len(email_messages)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_queues_email(self, client):
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'new@yamdb.fake', 'username': 'new_user'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо сама'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.to == 'new@yamdb.fake'
+        assert 'confirmation_code' in email.body
+
+        call_command('send-emails', once=True)
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.body == '', (
+            'Проверьте, что код подтверждения не хранится после отправки'
+        )
+        call_command('send-emails', once=True)
+        assert len(mail.outbox) == 1, 'Проверьте, что письмо уходит один раз'
+
+    def test_failed_email_is_retried(self, settings):
+        email = OutboxEmail.objects.create(
+            subject='-', body='-', from_email='a@yamdb.fake',
+            to='b@yamdb.fake',
+        )
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        call_command('send-emails', once=True)
+
+        email.refresh_from_db()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTPServerDisconnected' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повтор откладывается'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send-emails', once=True)
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert len(mail.outbox) == 1
+
+    def test_gives_up_after_max_attempts(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_OUTBOX_BACKOFF = 0
+        email = OutboxEmail.objects.create(
+            subject='-', body='-', from_email='a@yamdb.fake',
+            to='b@yamdb.fake',
+        )
+        call_command('send-emails', once=True)
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.sent_at is None
+        assert email.body == ''
+
+    def test_email_is_claimed_before_sending(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.ClaimCheckingBackend'
+        ClaimCheckingBackend.seen.clear()
+        OutboxEmail.objects.create(
+            subject='-', body='-', from_email='a@yamdb.fake',
+            to='b@yamdb.fake',
+        )
+        call_command('send-emails', once=True)
+        [(attempts, next_attempt_at)] = ClaimCheckingBackend.seen
+        assert attempts == 1
+        assert next_attempt_at > timezone.now(), (
+            'Проверьте, что письмо забирается в отдельной транзакции '
+            'до отправки'
+        )
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_titles_cursor_walk(self, client):
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(7)
+        ]
+        url = '/api/v1/titles/?pagination=cursor&limit=3'
+        seen = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не выполняет COUNT'
+            )
+            seen.extend(title['id'] for title in data['results'])
+            url = data['next']
+        assert seen == [title.pk for title in titles]
+
+    def test_limit_offset_is_default(self, client, title):
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 1
+
+    def test_reviews_cursor_newest_first(
+        self, client, title, user, another_user
+    ):
+        first = Review.objects.create(
+            title=title, author=user, text='-', score=5
+        )
+        second = Review.objects.create(
+            title=title, author=another_user, text='-', score=6
+        )
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=1'
+        )
+        data = response.json()
+        assert [review['id'] for review in data['results']] == [second.pk]
+        data = client.get(data['next']).json()
+        assert [review['id'] for review in data['results']] == [first.pk]
+        assert data['next'] is None
+
+
+@pytest.mark.django_db
+class TestStreamingList:
+
+    def get_stream(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что с параметром stream список отдаётся потоком'
+        )
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_titles_stream_keeps_envelope(self, client, category):
+        for i in range(5):
+            Title.objects.create(
+                name=f'Произведение {i}', year=2000, category=category
+            )
+        url = '/api/v1/titles/?limit=3&offset=1'
+        expected = client.get(url).json()
+
+        data = self.get_stream(client, url + '&stream=true')
+
+        assert list(data) == ['count', 'next', 'previous', 'results']
+        assert data['count'] == expected['count']
+        assert data['results'] == expected['results']
+        assert 'stream=true' in data['next']
+
+    def test_reviews_stream_with_cursor(
+        self, client, title, user, another_user
+    ):
+        reviews = [
+            Review.objects.create(title=title, author=author, text='-', score=5)
+            for author in (user, another_user)
+        ]
+        url = (
+            f'/api/v1/titles/{title.pk}/reviews/'
+            '?pagination=cursor&limit=1&stream=1'
+        )
+        data = self.get_stream(client, url)
+        assert [review['id'] for review in data['results']] == [reviews[1].pk]
+        data = self.get_stream(client, data['next'])
+        assert [review['id'] for review in data['results']] == [reviews[0].pk]
+        assert data['next'] is None
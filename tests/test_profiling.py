@@ -0,0 +1,65 @@
+import pstats
+
+import pytest
+
+from api_yamdb.profiling import armed_requests
+from reviews.models import Category
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.MIDDLEWARE = [
+        'api_yamdb.profiling.ProfilingMiddleware', *settings.MIDDLEWARE
+    ]
+    settings.REQUEST_PROFILING_SAMPLE_RATE = 0
+    settings.REQUEST_PROFILING_SLOW_MS = 10 ** 6
+    settings.REQUEST_PROFILING_DIR = tmp_path
+    armed_requests.clear()
+    yield tmp_path
+    armed_requests.clear()
+
+
+@pytest.mark.django_db
+def test_server_timing(client, profiling):
+    Category.objects.create(name='Фильм', slug='film')
+    response = client.get('/api/v1/categories/')
+    assert response.status_code == 200
+    timing = dict(
+        part.strip().split(';', 1)
+        for part in response['Server-Timing'].split(',')
+    )
+    assert set(timing) == {'db', 'serializer', 'total'}, (
+        'Проверьте, что Server-Timing содержит db, serializer и total'
+    )
+    assert 'desc="0 queries"' not in timing['db']
+    assert float(timing['serializer'].split('=')[1]) > 0
+    assert not list(profiling.iterdir())
+
+
+@pytest.mark.django_db
+def test_sampled_request_dumps_profile(client, profiling, settings):
+    settings.REQUEST_PROFILING_SAMPLE_RATE = 1
+    client.get('/api/v1/categories/')
+    dumps = list(profiling.iterdir())
+    assert len(dumps) == 1
+    assert dumps[0].name.startswith('CategoryViewSet.list.'), (
+        'Проверьте, что дамп назван по представлению'
+    )
+    assert pstats.Stats(str(dumps[0])).total_calls > 0
+
+
+@pytest.mark.django_db
+def test_slow_request_profiles_its_retry(client, profiling, settings):
+    settings.REQUEST_PROFILING_SLOW_MS = 0
+    client.get('/api/v1/genres/', {'search': 'slow'})
+    assert not list(profiling.iterdir())
+    assert list(armed_requests) == ['GET /api/v1/genres/?search=slow']
+    client.get('/api/v1/genres/')
+    assert not list(profiling.iterdir()), (
+        'Проверьте, что другой запрос к представлению не профилируется'
+    )
+    client.get('/api/v1/genres/', {'search': 'slow'})
+    assert [dump.name.split('.')[:2] for dump in profiling.iterdir()] == [
+        ['GenreViewSet', 'list']
+    ], 'Проверьте, что профилируется повтор медленного запроса'
+    assert list(armed_requests) == ['GET /api/v1/genres/']
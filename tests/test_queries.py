@@ -0,0 +1,98 @@
+import pytest
+
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def titles(category):
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {i:02}', year=2000, category=category
+        )
+        for i in range(25)
+    ]
+    for title in titles:
+        title.genre.set(genres)
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('limit', [1, 10, 25])
+    def test_titles_list_queries(
+        self, client, titles, django_assert_num_queries, limit
+    ):
+        # Версия для ETag, COUNT, страница произведений с категориями,
+        # жанры страницы.
+        with django_assert_num_queries(4):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(len(title['genre']) == 3 for title in results)
+        assert all(title['category'] for title in results)
+
+    def test_title_detail_queries(
+        self, client, titles, django_assert_num_queries
+    ):
+        # Версия для ETag, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{titles[0].pk}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 3
+
+
+@pytest.mark.django_db
+class TestNestedQueries:
+
+    @pytest.fixture
+    def review(self, title, user):
+        return Review.objects.create(
+            title=title, author=user, text='-', score=5
+        )
+
+    def test_comments_list_queries(
+        self, client, title, review, another_user, django_assert_num_queries
+    ):
+        Comment.objects.create(review=review, author=another_user, text='-')
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        # Версия для ETag, отзыв вместе с произведением, COUNT, страница.
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_review_must_belong_to_title(
+        self, client, user_client, review, category
+    ):
+        other = Title.objects.create(name='Другое', year=2000)
+        url = f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что отзыв другого произведения не найден'
+        )
+        response = user_client.post(url, data={'text': '-'})
+        assert response.status_code == 404
+        assert not Comment.objects.exists()
+
+    def test_create_comment_queries(
+        self, user_client, title, review, django_assert_max_num_queries
+    ):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        with django_assert_max_num_queries(3):
+            response = user_client.post(url, data={'text': '-'})
+        assert response.status_code == 201
+
+
+@pytest.mark.django_db
+def test_hot_queries_use_indexes():
+    from django.core.management import call_command
+
+    # Команда завершается ошибкой, если таблица читается целиком.
+    call_command(
+        'explain-queries', titles=200, reviews=3, comments=1, repeat=1
+    )
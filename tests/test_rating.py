@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from reviews.models import Review, Title
+
+
+def refresh(title):
+    return Title.objects.get(pk=title.pk)
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        assert refresh(title).rating is None, (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=7
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Отлично', score=10
+        )
+        title = refresh(title)
+        assert (title.score_sum, title.score_count) == (17, 2)
+        assert title.rating == 9, (
+            'Проверьте, что рейтинг округляется как Round(Avg(score))'
+        )
+
+        review.score = 1
+        review.save()
+        title = refresh(title)
+        assert (title.score_sum, title.score_count, title.rating) == (11, 2, 6)
+
+        review.delete()
+        title = refresh(title)
+        assert (title.score_sum, title.score_count, title.rating) == (10, 1, 10)
+
+    def test_rating_on_cascade_delete(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='-', score=2)
+        Review.objects.create(
+            title=title, author=another_user, text='-', score=5
+        )
+        user.delete()
+        title = refresh(title)
+        assert (title.score_sum, title.score_count, title.rating) == (5, 1, 5)
+
+        another_user.delete()
+        title = refresh(title)
+        assert (title.score_sum, title.score_count, title.rating) == (0, 0, None)
+
+    def test_titles_list_rating(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='-', score=8)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        result = response.json()['results'][0]
+        assert result['rating'] == 8
+        assert 'score_sum' not in result and 'score_count' not in result
+
+    def test_recalculate_rating(self, title, user):
+        Review.objects.create(title=title, author=user, text='-', score=4)
+        Title.objects.update(score_sum=0, score_count=0, rating=None)
+
+        with pytest.raises(CommandError):
+            call_command('recalculate-rating', check=True)
+        call_command('recalculate-rating')
+        call_command('recalculate-rating', check=True)
+        title = refresh(title)
+        assert (title.score_sum, title.score_count, title.rating) == (4, 1, 4)
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_duplicate_review(
+        self, user_client, title, django_assert_max_num_queries
+    ):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        # Произведение, вставка отзыва и обновление рейтинга
+        # в одной точке сохранения.
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data={'text': '-', 'score': 4})
+        assert response.status_code == 201
+        response = user_client.post(url, data={'text': '-', 'score': 8})
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [
+            'Вы не можете дважды комментировать одно произведение'
+        ]}
+        title.refresh_from_db()
+        assert title.rating == 4, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг'
+        )
+
+    def test_change_author_to_duplicate(
+        self, user_client, title, user, another_user
+    ):
+        Review.objects.create(
+            title=title, author=another_user, text='-', score=2
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='-', score=4
+        )
+        response = user_client.patch(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            data={'author': another_user.username},
+            format='json',
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что смена автора на уже оставившего отзыв '
+            'возвращает 400'
+        )
+        assert response.json() == {'non_field_errors': [
+            'Вы не можете дважды комментировать одно произведение'
+        ]}
+        review.refresh_from_db()
+        assert review.author == user
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'sqlite',
+    reason='SQLite в памяти блокирует таблицу, а не ждёт транзакцию',
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_reviews(title, user):
+    from rest_framework.test import APIClient
+
+    url = f'/api/v1/titles/{title.pk}/reviews/'
+    barrier = Barrier(4)
+
+    def post(score):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            return client.post(url, data={'text': '-', 'score': score})
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(post, range(1, 5)))
+
+    assert sorted(response.status_code for response in responses) == [
+        201, 400, 400, 400
+    ], 'Проверьте, что при гонке создаётся только один отзыв'
+    assert Review.objects.filter(title=title, author=user).count() == 1
+    title.refresh_from_db()
+    assert title.score_count == 1
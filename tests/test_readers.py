@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from api.readers import get_read_plan
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleReadOnlySerializer,
+)
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalogue(title, user, another_user):
+    Title.objects.create(name='Без категории', year=1990, description='-')
+    title.genre.add(
+        Genre.objects.create(name='Фэнтези', slug='fantasy'),
+        Genre.objects.create(name='Драма', slug='drama'),
+    )
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв "в кавычках"', score=9
+    )
+    Review.objects.create(title=title, author=another_user, text='-', score=2)
+    Comment.objects.create(review=review, author=another_user, text='Да')
+
+
+@pytest.mark.django_db
+class TestReadPlan:
+
+    @pytest.mark.parametrize('serializer_class, queryset', [
+        (TitleReadOnlySerializer, Title.objects.prefetch_related('genre')),
+        (ReviewSerializer, Review.objects.all()),
+        (CommentSerializer, Comment.objects.all()),
+    ])
+    def test_plan_matches_serializer(
+        self, catalogue, serializer_class, queryset
+    ):
+        renderer = JSONRenderer()
+        queryset = queryset.order_by('pk')
+        plan = get_read_plan(serializer_class)
+
+        expected = serializer_class(queryset, many=True).data
+        data = plan.build(list(plan.rows(queryset)))
+
+        assert renderer.render(data) == renderer.render(expected), (
+            'Проверьте, что план чтения отдаёт тот же JSON, что сериализатор'
+        )
+
+    def test_benchmark_command(self, catalogue, capsys):
+        call_command('benchmark-read', rows=10, repeat=1)
+        assert 'ускорение' in capsys.readouterr().out
@@ -0,0 +1,62 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalogue(category):
+    books = Category.objects.create(name='Книга', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        'ship': Title.objects.create(
+            name='Корабль', year=1997, category=category,
+            description='Лайнер и айсберг',
+        ),
+        'love': Title.objects.create(
+            name='Любовь и голуби', year=1984, category=category,
+        ),
+        'book': Title.objects.create(
+            name='Лайнер', year=2001, category=books,
+            description='Книга про корабль',
+        ),
+    }
+    titles['book'].genre.add(drama)
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def search(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_search_ranks_name_matches_first(self, client, catalogue):
+        assert self.search(client, {'q': 'корабль'}) == [
+            'Корабль', 'Лайнер'
+        ]
+
+    def test_search_combines_with_filters(self, client, catalogue):
+        assert self.search(client, {'q': 'лайнер', 'genre': 'drama'}) == [
+            'Лайнер'
+        ]
+        assert self.search(
+            client, {'q': 'лайнер', 'category': 'films'}
+        ) == ['Корабль']
+
+    def test_search_index_follows_updates(
+        self, client, catalogue, django_capture_on_commit_callbacks
+    ):
+        title = catalogue['love']
+        with django_capture_on_commit_callbacks(execute=True):
+            title.name = 'Голуби'
+            title.save()
+        assert self.search(client, {'q': 'любовь'}) == []
+        assert self.search(client, {'q': 'голуби'}) == ['Голуби']
+        with django_capture_on_commit_callbacks(execute=True):
+            title.delete()
+        assert self.search(client, {'q': 'голуби'}) == []
+
+    def test_search_escapes_query_syntax(self, client, catalogue):
+        assert self.search(client, {'q': 'корабль" OR *'}) == []
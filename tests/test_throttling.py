@@ -0,0 +1,89 @@
+import pytest
+
+from api.throttling import take_token
+
+
+def test_take_token():
+    bucket, wait = take_token(None, 2, 1, now=0)
+    assert wait == 0
+    bucket, wait = take_token(bucket, 2, 1, now=0)
+    assert wait == 0
+    bucket, wait = take_token(bucket, 2, 1, now=0.25)
+    assert wait == pytest.approx(0.75)
+    bucket, wait = take_token(bucket, 2, 1, now=1)
+    assert wait == 0, 'Проверьте, что корзина пополняется со временем'
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def signup(self, client, username):
+        return client.post('/api/v1/auth/signup/', data={
+            'email': f'{username}@yamdb.fake', 'username': username
+        })
+
+    @pytest.mark.parametrize('store', ['local', 'cache'])
+    def test_ip_limit(self, client, settings, store):
+        settings.THROTTLE_STORE = store
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'auth_ip': '2/min', 'auth_username': None
+            },
+        }
+        assert self.signup(client, 'first').status_code == 200
+        assert self.signup(client, 'second').status_code == 200
+        response = self.signup(client, 'third')
+        assert response.status_code == 429
+        assert 0 < int(response['Retry-After']) <= 30
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'first', 'confirmation_code': '-'
+        })
+        assert response.status_code == 429, (
+            'Проверьте, что лимит по адресу общий для signup и token'
+        )
+
+    def test_forwarded_for_is_not_spoofed(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'auth_ip': '2/min', 'auth_username': None
+            },
+        }
+        for number, spoofed in enumerate(['1.1.1.1', '2.2.2.2', '3.3.3.3']):
+            response = client.post(
+                '/api/v1/auth/signup/',
+                data={
+                    'email': f'user{number}@yamdb.fake',
+                    'username': f'user{number}',
+                },
+                HTTP_X_FORWARDED_FOR=f'{spoofed}, 10.0.0.5',
+            )
+        assert response.status_code == 429, (
+            'Проверьте, что адрес берётся из записи nginx, '
+            'а не из присланного клиентом X-Forwarded-For'
+        )
+
+    def test_username_limit(self, client, admin_api_client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'auth_ip': None, 'auth_username': '1/min'
+            },
+        }
+        assert self.signup(client, 'first').status_code == 200
+        assert self.signup(client, 'First').status_code == 429
+        assert self.signup(client, 'second').status_code == 200
+        response = admin_api_client.get('/api/v1/throttle/stats/')
+        assert response.json() == {'auth_ip': 0, 'auth_username': 1}
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/auth/signup/', '/api/v1/auth/token/'
+    ])
+    def test_non_object_body(self, client, url):
+        response = client.post(
+            url, data=[1, 2], content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что тело не объект не ломает ограничение по username'
+        )
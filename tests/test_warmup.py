@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from os.path import dirname, join
+
+import pytest
+
+from api_yamdb.warmup import get_view_serializers, warm_up
+
+PROJECT_DIR = join(dirname(dirname(__file__)), 'api_yamdb')
+
+WARM_UP_WORKER = (
+    'import django; django.setup();'
+    'from django.db import connection;'
+    'from api_yamdb.warmup import warm_up, warm_up_worker;'
+    'warm_up(); warm_up_worker();'
+    'print(connection.connection is not None)'
+)
+
+
+def test_warm_up():
+    warm_up()
+    assert 'TitleReadOnlySerializer' in {
+        serializer_class.__name__
+        for serializer_class in get_view_serializers()
+    }, 'Проверьте, что прогреваются сериализаторы чтения и записи'
+
+
+@pytest.mark.parametrize(
+    'settings_module', ['api_yamdb.settings', 'api_yamdb.settings_api']
+)
+@pytest.mark.parametrize(
+    'conn_max_age, connected', [('0', 'False'), ('60', 'True')]
+)
+def test_warm_up_worker(settings_module, conn_max_age, connected, tmp_path):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': settings_module,
+        'DB_ENGINE': 'django.db.backends.sqlite3',
+        'DB_NAME': str(tmp_path / 'db.sqlite3'),
+        'DB_CONN_MAX_AGE': conn_max_age,
+    }
+    result = subprocess.run(
+        [sys.executable, '-c', WARM_UP_WORKER],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == connected, (
+        'Проверьте, что соединение открывается, только если оно '
+        'переживает запрос'
+    )